@@ -0,0 +1,34 @@
+"""add (user_id, start_time) index to study_sessions
+
+Revision ID: add_sessions_user_start_idx
+Revises: add_plan_share_token
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_sessions_user_start_idx"
+down_revision: Union[str, None] = "add_plan_share_token"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    indexes = [idx["name"] for idx in inspector.get_indexes("study_sessions")]
+
+    if "ix_study_sessions_user_id_start_time" not in indexes:
+        op.create_index(
+            "ix_study_sessions_user_id_start_time",
+            "study_sessions",
+            ["user_id", "start_time"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_study_sessions_user_id_start_time", table_name="study_sessions")
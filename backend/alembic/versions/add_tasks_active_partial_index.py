@@ -0,0 +1,41 @@
+"""add partial index on open, non-template tasks per user
+
+Revision ID: add_tasks_active_idx
+Revises: add_sessions_user_start_idx
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_tasks_active_idx"
+down_revision: Union[str, None] = "add_sessions_user_start_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    indexes = [idx["name"] for idx in inspector.get_indexes("tasks")]
+
+    if "ix_tasks_user_id_active" not in indexes:
+        # Same predicate as the `.is_(False)` filters in the task queries
+        active = sa.and_(
+            sa.column("is_completed").is_(False),
+            sa.column("is_recurring_template").is_(False),
+        )
+        op.create_index(
+            "ix_tasks_user_id_active",
+            "tasks",
+            ["user_id"],
+            postgresql_where=active,
+            sqlite_where=active,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_id_active", table_name="tasks")
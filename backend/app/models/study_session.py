@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Enum as SQLEnum,
     ForeignKey,
+    Index,
     Integer,
     String,
 )
@@ -25,6 +26,7 @@ class SessionStatus(str, PyEnum):
 
 class StudySession(Base):
     __tablename__ = "study_sessions"
+    __table_args__ = (Index("ix_study_sessions_user_id_start_time", "user_id", "start_time"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Enum as SQLEnum,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
@@ -79,6 +80,17 @@ class Task(Base):
         onupdate=datetime.utcnow,
     )
 
+    # Partial index for the scheduler/workload queries over a user's open, non-template
+    # tasks. The WHERE clause mirrors their `.is_(False)` filters so the planner can use it.
+    __table_args__ = (
+        Index(
+            "ix_tasks_user_id_active",
+            "user_id",
+            postgresql_where=is_completed.is_(False) & is_recurring_template.is_(False),
+            sqlite_where=is_completed.is_(False) & is_recurring_template.is_(False),
+        ),
+    )
+
     user = relationship("User", back_populates="tasks")
     subject = relationship("Subject", back_populates="tasks")
     recurring_template = relationship(
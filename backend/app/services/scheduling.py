@@ -1,16 +1,23 @@
 from __future__ import annotations
 
 import logging
+from bisect import bisect_left
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import date, datetime, time, timedelta, timezone
-from typing import Any, Iterable, Literal, Sequence
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Literal, Sequence
 from zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=128)
 def _safe_tz(tz_str: str | None) -> ZoneInfo:
-    """Return ZoneInfo for the given string, falling back to UTC on bad input."""
+    """Return ZoneInfo for the given string, falling back to UTC on bad input.
+
+    Memoized: the scheduler resolves the same user timezone many times per plan.
+    """
     if tz_str:
         try:
             return ZoneInfo(tz_str)
@@ -18,7 +25,7 @@ def _safe_tz(tz_str: str | None) -> ZoneInfo:
             logger.warning("Invalid timezone %r — falling back to UTC", tz_str)
     return ZoneInfo("UTC")
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.models.constraint import ConstraintType, ScheduleConstraint
 from app.models.daily_energy import DailyEnergy, EnergyLevel
@@ -34,6 +41,18 @@ WINDOW_SCHEDULE = {
     "night": (time(hour=21), time(hour=23)),
 }
 
+ONE_DAY = timedelta(days=1)
+
+# Zone keys that are always UTC+0 (the default user timezone is "UTC")
+UTC_ZONE_KEYS = frozenset({"UTC", "Etc/UTC", "GMT"})
+
+
+def _normalize_to_utc_aware(dt: datetime) -> datetime:
+    """Normalize datetime to UTC-aware."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
 
 def _parse_custom_time(time_str: str) -> time | None:
     """Parse time string in HH:MM format to time object."""
@@ -82,16 +101,8 @@ def _parse_window_config(window_config: any) -> tuple[time, time] | None:
     return None
 
 
-def _parse_study_windows(preferred_windows_raw: any) -> list[tuple[time, time]]:
-    """
-    Parse preferred study windows from various formats (backward compatible).
-    
-    Supports:
-    - Old format: ["morning", "evening"] (list of strings)
-    - New format: [{"type": "preset", "value": "morning"}, {"type": "custom", "value": {"start": "08:00", "end": "10:30"}}]
-    
-    Returns list of (start_time, end_time) tuples.
-    """
+def _parse_study_windows_uncached(preferred_windows_raw: any) -> list[tuple[time, time]]:
+    """Parse preferred study windows without memoization (see _parse_study_windows)."""
     default = [(WINDOW_SCHEDULE["evening"][0], WINDOW_SCHEDULE["evening"][1])]
     
     if not preferred_windows_raw:
@@ -114,6 +125,72 @@ def _parse_study_windows(preferred_windows_raw: any) -> list[tuple[time, time]]:
     
     return windows if windows else default
 
+
+def _freeze_window_value(value: any) -> str | tuple[Any, Any] | None:
+    """Hashable form of a window value: preset name or (start, end) of a custom range."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return (value.get("start"), value.get("end"))
+    if hasattr(value, "start") and hasattr(value, "end"):
+        return (value.start, value.end)
+    raise TypeError(f"Unsupported study window value: {value!r}")
+
+
+def _study_windows_key(preferred_windows_raw: any) -> tuple | None:
+    """Build a hashable cache key for preferred study windows, or None if not cacheable."""
+    if not isinstance(preferred_windows_raw, list):
+        return None
+    try:
+        if preferred_windows_raw and isinstance(preferred_windows_raw[0], str):
+            # Old format keeps its elements as-is (mirrors the parser's branch)
+            key: tuple = tuple(preferred_windows_raw)
+        else:
+            key = tuple(
+                (
+                    (config.get("type"), _freeze_window_value(config.get("value")))
+                    if isinstance(config, dict)
+                    else (getattr(config, "type", None), _freeze_window_value(getattr(config, "value", None)))
+                )
+                for config in preferred_windows_raw
+            )
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@lru_cache(maxsize=256)
+def _parse_frozen_study_windows(key: tuple) -> tuple[tuple[time, time], ...]:
+    """Parse study windows from a key built by _study_windows_key."""
+    if key and isinstance(key[0], tuple):
+        raw: list = [
+            {"type": window_type, "value": {"start": value[0], "end": value[1]} if isinstance(value, tuple) else value}
+            for window_type, value in key
+        ]
+    else:
+        raw = list(key)
+    return tuple(_parse_study_windows_uncached(raw))
+
+
+def _parse_study_windows(preferred_windows_raw: any) -> list[tuple[time, time]]:
+    """
+    Parse preferred study windows from various formats (backward compatible).
+    
+    Supports:
+    - Old format: ["morning", "evening"] (list of strings)
+    - New format: [{"type": "preset", "value": "morning"}, {"type": "custom", "value": {"start": "08:00", "end": "10:30"}}]
+    
+    Results are memoized on a frozen copy of the input, since a user's windows
+    rarely change between schedule generations.
+    
+    Returns list of (start_time, end_time) tuples.
+    """
+    key = _study_windows_key(preferred_windows_raw)
+    if key is None:
+        return _parse_study_windows_uncached(preferred_windows_raw)
+    return list(_parse_frozen_study_windows(key))
+
 PRIORITY_WEIGHT = {
     TaskPriority.LOW: 0.8,
     TaskPriority.MEDIUM: 1.0,
@@ -134,7 +211,7 @@ ENERGY_SESSION_CAP = {
 }
 
 
-@dataclass(order=True)
+@dataclass(order=True, slots=True)
 class WeightedTask:
     sort_index: float = field(init=False, repr=False, compare=True)
     weight: float = field(compare=False)
@@ -174,27 +251,16 @@ def _calculate_subject_weight_modifier(
     return modifier
 
 
-def _calculate_deadline_weight_modifier(task: Task, reference: datetime) -> float:
-    """Calculate weight modifier based on task deadline.
-    If deadline is None, treat as the lowest urgency (returns lowest modifier).
+def _calculate_deadline_weight_modifier(days_until_deadline: float | None) -> float:
+    """Calculate weight modifier from the (fractional) days left until the task deadline.
+    If there is no deadline, treat as the lowest urgency (returns lowest modifier).
     """
-    deadline = task.deadline
-    ref = reference
-
-    if not deadline:
+    if days_until_deadline is None:
         # No deadline, so treat as lowest urgency
         return 1.0
-
-    # Make both UTC-aware (assume naive values are UTC)
-    if deadline.tzinfo is None:
-        deadline = deadline.replace(tzinfo=timezone.utc)
-    if ref and ref.tzinfo is None:
-        ref = ref.replace(tzinfo=timezone.utc)
-
-    delta_days = (deadline - ref).total_seconds() / 86400
-    if delta_days <= 0:
+    if days_until_deadline <= 0:
         return 1.75
-    deadline_pressure = max(0, 7 - delta_days) / 7
+    deadline_pressure = max(0, 7 - days_until_deadline) / 7
     return 1 + deadline_pressure
 
 
@@ -210,7 +276,14 @@ def calculate_weights(
         reference: Reference datetime (UTC)
         user_tz: User's timezone for proper date comparisons
     """
-    subject_map = {subject.id: subject for subject in subjects}
+    # The subject modifier only depends on the subject and the reference date,
+    # so compute it once per subject; a single lookup per task yields both
+    subject_entries: dict[int, tuple[Subject, float]] = {
+        subject.id: (subject, _calculate_subject_weight_modifier(subject, reference, user_tz))
+        for subject in subjects
+    }
+    get_subject_entry = subject_entries.get
+    ref_aware = _normalize_to_utc_aware(reference)
     weighted_tasks: list[WeightedTask] = []
 
     for task in tasks:
@@ -222,27 +295,27 @@ def calculate_weights(
         if task.is_recurring_template:
             continue
         
-        # For recurring task instances, only schedule if deadline is within 10 days
-        # This prevents far-off recurring tasks from filling empty schedule slots
-        if task.recurring_template_id and task.deadline:
-            # Make both UTC-aware for comparison
-            deadline = task.deadline
+        # Days until deadline, computed once per task (naive deadlines are UTC)
+        deadline = task.deadline
+        days_until_deadline = None
+        if deadline:
             if deadline.tzinfo is None:
                 deadline = deadline.replace(tzinfo=timezone.utc)
-            ref_aware = reference if reference.tzinfo else reference.replace(tzinfo=timezone.utc)
-            
             days_until_deadline = (deadline - ref_aware).total_seconds() / 86400
-            # Skip if deadline is more than 10 days away
-            if days_until_deadline > 10:
-                continue
         
-        subject = subject_map.get(task.subject_id)
-        weight = PRIORITY_WEIGHT[task.priority]
+        # For recurring task instances, only schedule if deadline is within 10 days
+        # This prevents far-off recurring tasks from filling empty schedule slots
+        if task.recurring_template_id and days_until_deadline is not None and days_until_deadline > 10:
+            continue
         
-        if subject:
-            weight *= _calculate_subject_weight_modifier(subject, reference, user_tz)
+        weight = PRIORITY_WEIGHT[task.priority]
+        subject_entry = get_subject_entry(task.subject_id)
+        subject = None
+        if subject_entry:
+            subject, subject_modifier = subject_entry
+            weight *= subject_modifier
         
-        weight *= _calculate_deadline_weight_modifier(task, reference)
+        weight *= _calculate_deadline_weight_modifier(days_until_deadline)
         weight += task.estimated_minutes / 120
         
         # Ensure CRITICAL tasks always rank above HIGH priority tasks
@@ -283,6 +356,14 @@ def calculate_weights(
     return weighted_tasks
 
 
+def _local_midnight(reference: datetime, tz: ZoneInfo) -> datetime:
+    """Get midnight in the user's timezone for the day containing reference (aware, local)."""
+    if reference.tzinfo is None:
+        reference = reference.replace(tzinfo=timezone.utc)
+    localized = reference.astimezone(tz)
+    return localized.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
 def _local_day_start(reference: datetime, tz_str: str) -> datetime:
     """
     Get start of day in user's timezone, returned as naive UTC datetime.
@@ -290,42 +371,50 @@ def _local_day_start(reference: datetime, tz_str: str) -> datetime:
     This returns the UTC datetime that corresponds to midnight in the user's timezone
     for the day that contains the reference time.
     """
-    tz = _safe_tz(tz_str)
-    # Convert reference to user's timezone
-    if reference.tzinfo is None:
-        reference = reference.replace(tzinfo=timezone.utc)
-    localized = reference.astimezone(tz)
-    # Get midnight in user's timezone
-    day_start_local = localized.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_start_local = _local_midnight(reference, _safe_tz(tz_str))
     # Convert back to UTC and return as naive (for database storage)
     return day_start_local.astimezone(timezone.utc).replace(tzinfo=None)
 
 
-def _window_to_range(day_start: datetime, block: tuple[time, time], user_tz: str) -> tuple[datetime, datetime]:
+def _constant_utc_offset(start_local: datetime, num_days: int) -> timedelta | None:
     """
-    Convert time block to datetime range in user's timezone, then to UTC.
-    
+    Return the UTC offset of start_local if it is unchanged at every local midnight
+    for the next num_days days, or None if a DST transition falls in that span.
+    """
+    offset = start_local.utcoffset()
+    for i in range(1, num_days + 1):
+        if (start_local + timedelta(days=i)).utcoffset() != offset:
+            return None
+    return offset
+
+
+def _local_window_to_range(
+    day_start_local: datetime,
+    block: tuple[time, time],
+    utc_offset: timedelta | None = None,
+) -> tuple[datetime, datetime]:
+    """
+    Apply a time block to an aware local midnight and return it as naive UTC datetimes.
+
     Args:
-        day_start: Start of day (naive UTC datetime representing midnight in user's tz)
+        day_start_local: Midnight of the day in the user's timezone (timezone-aware)
         block: Tuple of (start_time, end_time) as time objects
-        user_tz: User's timezone string (e.g., "Asia/Singapore")
-    
-    Returns:
-        Tuple of (start_datetime, end_datetime) as naive UTC datetimes
+        utc_offset: Known constant UTC offset for the day; when given, the conversion
+            is a plain subtraction instead of a zoneinfo lookup
     """
-    tz = ZoneInfo(user_tz)
-    # day_start is naive but represents midnight UTC that corresponds to midnight in user's tz
-    # We need to reconstruct the local midnight, then apply the time block, then convert to UTC
-    # Convert day_start (naive UTC) to aware UTC, then to user's timezone
-    day_start_utc = day_start.replace(tzinfo=timezone.utc)
-    day_start_local = day_start_utc.astimezone(tz)
-    
-    # Apply time block in user's local timezone
+    if utc_offset is not None:
+        midnight_utc = day_start_local.replace(tzinfo=None) - utc_offset
+        start_utc = midnight_utc + timedelta(hours=block[0].hour, minutes=block[0].minute)
+        end_utc = midnight_utc + timedelta(hours=block[1].hour, minutes=block[1].minute)
+        if end_utc <= start_utc:
+            end_utc += ONE_DAY
+        return start_utc, end_utc
+
     start_local = day_start_local.replace(hour=block[0].hour, minute=block[0].minute, second=0, microsecond=0)
     end_local = day_start_local.replace(hour=block[1].hour, minute=block[1].minute, second=0, microsecond=0)
     
     if end_local <= start_local:
-        end_local += timedelta(days=1)
+        end_local += ONE_DAY
     
     # Convert back to UTC (naive for storage)
     start_utc = start_local.astimezone(timezone.utc).replace(tzinfo=None)
@@ -334,66 +423,146 @@ def _window_to_range(day_start: datetime, block: tuple[time, time], user_tz: str
     return start_utc, end_utc
 
 
-def _is_recurring_constraint_relevant(constraint: ScheduleConstraint, weekday: int) -> bool:
-    """Check if a recurring constraint applies to the given weekday."""
-    return constraint.days_of_week and weekday in constraint.days_of_week
-
-
-def _is_one_time_constraint_relevant(
-    constraint: ScheduleConstraint, day: date, user_tz: ZoneInfo | None = None
-) -> bool:
-    """Check if a one-time constraint applies to the given day.
-    
-    Args:
-        constraint: The constraint to check
-        day: The LOCAL date in user's timezone
-        user_tz: User's timezone for proper date conversion
+def _window_to_range(day_start: datetime, block: tuple[time, time], user_tz: ZoneInfo) -> tuple[datetime, datetime]:
     """
-    if not constraint.start_datetime:
-        return False
-    
-    # Convert constraint datetimes to user's local timezone for proper date comparison
-    start_dt = constraint.start_datetime
-    if start_dt.tzinfo is None:
-        start_dt = start_dt.replace(tzinfo=timezone.utc)
-    if user_tz:
-        start_dt = start_dt.astimezone(user_tz)
-    
-    if start_dt.date() > day:
-        return False
+    Convert time block to datetime range in user's timezone, then to UTC.
     
-    if not constraint.end_datetime:
-        return False
+    Args:
+        day_start: Start of day (naive UTC datetime representing midnight in user's tz)
+        block: Tuple of (start_time, end_time) as time objects
+        user_tz: User's resolved timezone (see _safe_tz)
     
-    end_dt = constraint.end_datetime
-    if end_dt.tzinfo is None:
-        end_dt = end_dt.replace(tzinfo=timezone.utc)
+    Returns:
+        Tuple of (start_datetime, end_datetime) as naive UTC datetimes
+    """
+    # day_start is naive but represents midnight UTC that corresponds to midnight in user's tz
+    # Reconstruct the local midnight, then apply the time block in local time
+    day_start_local = day_start.replace(tzinfo=timezone.utc).astimezone(user_tz)
+    return _local_window_to_range(day_start_local, block)
+
+
+def _to_local_date(dt: datetime, user_tz: ZoneInfo | None) -> date:
+    """Get the date of a stored datetime (naive values are UTC) in the user's timezone."""
+    if dt.tzinfo is None:
+        if user_tz is None or user_tz.key in UTC_ZONE_KEYS:
+            return dt.date()  # Already UTC, nothing to convert
+        dt = dt.replace(tzinfo=timezone.utc)
     if user_tz:
-        end_dt = end_dt.astimezone(user_tz)
-    
-    return end_dt.date() >= day
+        dt = dt.astimezone(user_tz)
+    return dt.date()
 
 
-def _extract_constraints_for_day(
-    constraints: Iterable[ScheduleConstraint], day: date, user_tz: ZoneInfo | None = None
-) -> list[ScheduleConstraint]:
-    """Extract constraints that apply to the given day.
+def _bucket_constraints_by_day(
+    constraints: Iterable[ScheduleConstraint], first_day: date, num_days: int, user_tz: ZoneInfo | None = None
+) -> dict[date, list[ScheduleConstraint]]:
+    """Group constraints by the LOCAL days they apply to, in a single pass.
+    
+    Recurring constraints are matched on weekday; one-time constraints cover every
+    local date from their start to their end.
     
     Args:
         constraints: All user constraints
-        day: The LOCAL date in user's timezone
-        user_tz: User's timezone for proper date comparison of one-time constraints
+        first_day: First LOCAL date in user's timezone
+        num_days: Number of consecutive days to bucket
+        user_tz: User's timezone for proper date conversion of one-time constraints
     """
-    weekday = day.weekday()
-    relevant: list[ScheduleConstraint] = []
+    days = [first_day + timedelta(days=i) for i in range(num_days)]
+    last_day = days[-1]
+    recurring_by_weekday: dict[int, list[ScheduleConstraint]] = defaultdict(list)
+    one_time_by_day: dict[date, list[ScheduleConstraint]] = defaultdict(list)
+    
     for constraint in constraints:
         if constraint.is_recurring:
-            if _is_recurring_constraint_relevant(constraint, weekday):
-                relevant.append(constraint)
-        else:
-            if _is_one_time_constraint_relevant(constraint, day, user_tz):
-                relevant.append(constraint)
-    return relevant
+            for weekday in set(constraint.days_of_week or ()):
+                recurring_by_weekday[weekday].append(constraint)
+        elif constraint.start_datetime and constraint.end_datetime:
+            # Clamp to the requested days so long-running constraints stay cheap
+            day = max(_to_local_date(constraint.start_datetime, user_tz), first_day)
+            end = min(_to_local_date(constraint.end_datetime, user_tz), last_day)
+            while day <= end:
+                one_time_by_day[day].append(constraint)
+                day += ONE_DAY
+    
+    return {
+        day: recurring_by_weekday.get(day.weekday(), []) + one_time_by_day.get(day, [])
+        for day in days
+    }
+
+
+def _constraint_day_ranges(
+    constraints: list[ScheduleConstraint], user_tz: ZoneInfo | None = None
+) -> Callable[[datetime], tuple[list[datetime], list[tuple[datetime, datetime]]]]:
+    """
+    Return a lookup from a block start (naive UTC) to the constraint ranges on that
+    block's local day, as (sorted starts, ranges sorted by start) in naive UTC.
+    """
+    def to_naive_utc(dt: datetime) -> datetime:
+        # If timezone-aware, convert to UTC then make naive
+        # If already naive, assume it's UTC (as stored in database)
+        if dt.tzinfo is not None:
+            return dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt
+
+    # Read each constraint's ORM attributes once. One-time constraints get their
+    # naive UTC range up front; recurring ones keep their local (start, end) times
+    prepared: list[tuple[tuple[datetime, datetime] | None, time | None, time | None]] = []
+    for constraint in constraints:
+        start_datetime, end_datetime = constraint.start_datetime, constraint.end_datetime
+        if start_datetime and end_datetime:
+            prepared.append(((to_naive_utc(start_datetime), to_naive_utc(end_datetime)), None, None))
+        elif constraint.start_time and constraint.end_time:
+            prepared.append((None, constraint.start_time, constraint.end_time))
+
+    def get_recurring_range(start_time: time, end_time: time, block_start: datetime) -> tuple[datetime, datetime]:
+        """Get a recurring constraint's range on the block's day in naive UTC."""
+        # For recurring constraints, start_time/end_time are in user's local timezone
+        if not user_tz:
+            # Fallback: assume UTC (shouldn't happen in normal flow)
+            return (
+                block_start.replace(hour=start_time.hour, minute=start_time.minute),
+                block_start.replace(hour=end_time.hour, minute=end_time.minute),
+            )
+        # Convert block_start (naive UTC) to user's local timezone
+        block_start_local = block_start.replace(tzinfo=timezone.utc).astimezone(user_tz)
+        
+        # Apply constraint times in local timezone
+        c_start_local = block_start_local.replace(
+            hour=start_time.hour, minute=start_time.minute, second=0, microsecond=0
+        )
+        c_end_local = block_start_local.replace(
+            hour=end_time.hour, minute=end_time.minute, second=0, microsecond=0
+        )
+        
+        # Handle end time wrapping to next day
+        if c_end_local <= c_start_local:
+            c_end_local += ONE_DAY
+        
+        # Convert back to UTC (naive) for comparison
+        return (
+            c_start_local.astimezone(timezone.utc).replace(tzinfo=None),
+            c_end_local.astimezone(timezone.utc).replace(tzinfo=None),
+        )
+
+    # Constraint ranges only depend on the local day of the block, so build them
+    # once per day, sorted by start, and bisect to the ones that can overlap
+    ranges_by_day: dict[date, tuple[list[datetime], list[tuple[datetime, datetime]]]] = {}
+    
+    def get_day_ranges(block_start: datetime) -> tuple[list[datetime], list[tuple[datetime, datetime]]]:
+        day_key = block_start.replace(tzinfo=timezone.utc).astimezone(user_tz).date() if user_tz else block_start.date()
+        cached = ranges_by_day.get(day_key)
+        if cached is None:
+            day_ranges = sorted(
+                (
+                    fixed_range or get_recurring_range(start_time, end_time, block_start)
+                    for fixed_range, start_time, end_time in prepared
+                ),
+                key=lambda x: x[0],
+            )
+            cached = ([c_start for c_start, _ in day_ranges], day_ranges)
+            ranges_by_day[day_key] = cached
+        return cached
+    
+    return get_day_ranges
 
 
 def apply_constraints(
@@ -402,91 +571,25 @@ def apply_constraints(
     if not constraints:
         return blocks
 
-    def get_constraint_range(constraint: ScheduleConstraint, block_start: datetime) -> tuple[datetime, datetime] | None:
-        """Get the constraint time range in naive UTC for comparison with blocks."""
-        if constraint.start_datetime and constraint.end_datetime:
-            # Normalize constraint datetimes to naive UTC for comparison with blocks
-            c_start = constraint.start_datetime
-            c_end = constraint.end_datetime
-            
-            # If timezone-aware, convert to UTC then make naive
-            # If already naive, assume it's UTC (as stored in database)
-            if c_start.tzinfo is not None:
-                c_start = c_start.astimezone(timezone.utc).replace(tzinfo=None)
-            if c_end.tzinfo is not None:
-                c_end = c_end.astimezone(timezone.utc).replace(tzinfo=None)
-            
-            return (c_start, c_end)
-        elif constraint.start_time and constraint.end_time:
-            # For recurring constraints, start_time/end_time are in user's local timezone
-            if not user_tz:
-                # Fallback: assume UTC (shouldn't happen in normal flow)
-                c_start = block_start.replace(
-                    hour=constraint.start_time.hour, minute=constraint.start_time.minute
-                )
-                c_end = block_start.replace(
-                    hour=constraint.end_time.hour, minute=constraint.end_time.minute
-                )
-            else:
-                # Convert block_start (naive UTC) to user's local timezone
-                block_start_utc = block_start.replace(tzinfo=timezone.utc)
-                block_start_local = block_start_utc.astimezone(user_tz)
-                
-                # Apply constraint times in local timezone
-                c_start_local = block_start_local.replace(
-                    hour=constraint.start_time.hour, 
-                    minute=constraint.start_time.minute,
-                    second=0,
-                    microsecond=0
-                )
-                c_end_local = block_start_local.replace(
-                    hour=constraint.end_time.hour,
-                    minute=constraint.end_time.minute,
-                    second=0,
-                    microsecond=0
-                )
-                
-                # Handle end time wrapping to next day
-                if c_end_local <= c_start_local:
-                    c_end_local += timedelta(days=1)
-                
-                # Convert back to UTC (naive) for comparison
-                c_start = c_start_local.astimezone(timezone.utc).replace(tzinfo=None)
-                c_end = c_end_local.astimezone(timezone.utc).replace(tzinfo=None)
-            
-            return (c_start, c_end)
-        return None
-
+    get_day_ranges = _constraint_day_ranges(constraints, user_tz)
+    
     # Split blocks around constraints instead of just filtering them out
     result: list[tuple[datetime, datetime]] = []
     
     for block_start, block_end in blocks:
-        # Collect all constraint ranges that overlap with this block
-        constraint_ranges: list[tuple[datetime, datetime]] = []
-        for constraint in constraints:
-            constraint_range = get_constraint_range(constraint, block_start)
-            if constraint_range:
-                c_start, c_end = constraint_range
-                # Check if constraint overlaps with block
-                if not (block_end <= c_start or block_start >= c_end):
-                    constraint_ranges.append((c_start, c_end))
+        starts, day_ranges = get_day_ranges(block_start)
+        # Only constraints starting before the block ends can overlap it
+        candidates = day_ranges[:bisect_left(starts, block_end)]
         
-        if not constraint_ranges:
-            # No constraints overlap with this block, keep it as-is
-            result.append((block_start, block_end))
-            continue
-        
-        # Sort constraint ranges by start time
-        constraint_ranges.sort(key=lambda x: x[0])
-        
-        # Split the block around constraints
         current_start = block_start
-        for c_start, c_end in constraint_ranges:
+        for c_start, c_end in candidates:
+            if c_end <= current_start:
+                continue  # Ends before the uncovered part of the block
             # If there's space before the constraint, add it
             if current_start < c_start:
                 result.append((current_start, c_start))
             # Move current_start to after the constraint
-            current_start = max(current_start, c_end)
+            current_start = c_end
         
         # If there's space after the last constraint, add it
         if current_start < block_end:
@@ -495,22 +598,43 @@ def apply_constraints(
     return result
 
 
+def _windows_fully_blocked(
+    blocks: list[tuple[datetime, datetime]], constraints: list[ScheduleConstraint], user_tz: ZoneInfo | None = None
+) -> bool:
+    """
+    Whether constraints cover every block completely, i.e. apply_constraints would
+    return no free time. Stops at the first uncovered gap without building blocks.
+    """
+    if not constraints:
+        return not blocks
+    
+    get_day_ranges = _constraint_day_ranges(constraints, user_tz)
+    for block_start, block_end in blocks:
+        starts, day_ranges = get_day_ranges(block_start)
+        covered_until = block_start
+        for c_start, c_end in day_ranges[:bisect_left(starts, block_end)]:
+            if c_end <= covered_until:
+                continue
+            if covered_until < c_start:
+                return False  # Free time before this constraint
+            covered_until = c_end
+        if covered_until < block_end:
+            return False  # Free time after the last constraint
+    return True
+
+
 def insert_breaks(
     sessions: list[StudyBlock], break_minutes: int
 ) -> list[StudyBlock]:
-    if not sessions:
-        return sessions
-    adjusted: list[StudyBlock] = []
-    for idx, session in enumerate(sessions):
-        adjusted.append(session)
-        if idx < len(sessions) - 1:
-            gap = sessions[idx + 1].start_time - session.end_time
-            required_gap = timedelta(minutes=break_minutes)
-            if gap < required_gap:
-                shift = required_gap - gap
-                sessions[idx + 1].start_time += shift
-                sessions[idx + 1].end_time += shift
-    return adjusted
+    """Shift sessions later in place so consecutive sessions are at least break_minutes apart."""
+    required_gap = timedelta(minutes=break_minutes)
+    for prev, curr in zip(sessions, sessions[1:]):
+        gap = curr.start_time - prev.end_time
+        if gap < required_gap:
+            shift = required_gap - gap
+            curr.start_time += shift
+            curr.end_time += shift
+    return sessions
 
 
 def interleave_subjects(sessions: list[StudyBlock], task_priorities: dict[int, str] | None = None) -> list[StudyBlock]:
@@ -531,42 +655,90 @@ def interleave_subjects(sessions: list[StudyBlock], task_priorities: dict[int, s
     if not task_priorities:
         return sessions
     
-    def is_critical(session: StudyBlock) -> bool:
-        if session.task_id and session.task_id in task_priorities:
-            return task_priorities[session.task_id] == "CRITICAL"
+    result = list(sessions)
+    critical = _critical_flags(result, task_priorities)
+    
+    # Each position looks at most two sessions ahead, so this is a single O(N) pass.
+    for i in range(len(result) - 1):
+        if _should_swap_for_variety(result, critical, i):
+            result[i + 1], result[i + 2] = result[i + 2], result[i + 1]
+            critical[i + 1], critical[i + 2] = critical[i + 2], critical[i + 1]
+    
+    return result
+
+
+def _critical_flags(sessions: list[StudyBlock], task_priorities: dict[int, str]) -> list[bool]:
+    """Resolve each session's priority once; flags are swapped along with sessions."""
+    return [
+        bool(session.task_id) and task_priorities.get(session.task_id) == TaskPriority.CRITICAL.value
+        for session in sessions
+    ]
+
+
+def _should_swap_for_variety(result: list[StudyBlock], critical: list[bool], i: int) -> bool:
+    """
+    Whether the same-subject pair at positions i, i+1 should be broken up by
+    swapping the sessions at i+1 and i+2.
+    
+    Simple approach: only swap adjacent non-critical sessions for variety.
+    Never move a critical session down or a non-critical session above critical.
+    """
+    # If current or next is critical, never swap - they stay where they are
+    if critical[i] or critical[i + 1]:
         return False
     
-    # Simple approach: only swap adjacent non-critical sessions for variety
-    # Never move a critical session down or a non-critical session above critical
-    result = list(sessions)
+    # Both are non-critical: if same subject, try the session after next
+    current = result[i]
+    if current.subject_id != result[i + 1].subject_id or i + 2 >= len(result):
+        return False
+    return not critical[i + 2] and result[i + 2].subject_id != current.subject_id
+
+
+def _order_sessions_with_breaks(
+    sessions: list[StudyBlock],
+    break_minutes: int,
+    task_priorities: dict[int, str] | None = None,
+    block_ids: Sequence[int] | None = None,
+) -> list[StudyBlock]:
+    """
+    Space sessions with breaks (insert_breaks), then interleave subjects.
     
-    i = 0
-    while i < len(result) - 1:
-        current = result[i]
-        next_session = result[i + 1]
-        
-        # If current is critical, never swap it - move on
-        if is_critical(current):
-            i += 1
-            continue
-        
-        # If next is critical, don't swap - it should stay where it is
-        if is_critical(next_session):
-            i += 1
+    Subject swaps (see interleave_subjects) are only made between back-to-back
+    sessions in the same free block, and the pair trades places on the timeline,
+    so the day stays in chronological order and keeps its overall span.
+    
+    Args:
+        block_ids: Index of the free (unblocked) time block each session was
+            allocated in; sessions in different blocks are never swapped, since a
+            constraint or window edge sits between them. None means one block.
+    """
+    if len(sessions) < 2:
+        return sessions
+    
+    result = insert_breaks(list(sessions), break_minutes)
+    if not task_priorities:
+        return result
+    
+    required_gap = timedelta(minutes=break_minutes)
+    critical = _critical_flags(result, task_priorities)
+    for i in range(len(result) - 2):
+        if not _should_swap_for_variety(result, critical, i):
             continue
-        
-        # Both are non-critical: swap if same subject and there's a different subject ahead
-        if current.subject_id == next_session.subject_id:
-            # Look for a non-critical session with different subject to swap
-            for j in range(i + 2, len(result)):
-                candidate = result[j]
-                if is_critical(candidate):
-                    break  # Don't look past critical sessions
-                if candidate.subject_id != current.subject_id:
-                    # Swap next_session with candidate
-                    result[i + 1], result[j] = result[j], result[i + 1]
-                break
-        i += 1
+        if block_ids is not None and block_ids[i + 1] != block_ids[i + 2]:
+            continue  # A window edge or constraint lies between them; keep the order
+        second, third = result[i + 1], result[i + 2]
+        if third.start_time != second.end_time + required_gap:
+            continue  # Not back to back; keep the order
+        # Move the third session into the second's slot and follow it with the second;
+        # the pair still ends where the third did, so later gaps are unaffected
+        third_duration = third.end_time - third.start_time
+        second_duration = second.end_time - second.start_time
+        third.start_time = second.start_time
+        third.end_time = third.start_time + third_duration
+        second.start_time = third.end_time + required_gap
+        second.end_time = second.start_time + second_duration
+        result[i + 1], result[i + 2] = third, second
+        critical[i + 1], critical[i + 2] = critical[i + 2], critical[i + 1]
     
     return result
 
@@ -577,10 +749,10 @@ def _energy_cap(level: EnergyLevel | None, user_max: int) -> int:
 
 
 def _process_task_in_window(
-    tasks: list[WeightedTask],
+    tasks: deque[WeightedTask],
     pointer: datetime,
     window_end: datetime,
-    session_cap: timedelta,
+    session_cap_minutes: int,
     break_duration: timedelta,
     energy_level: EnergyLevel | None,
 ) -> tuple[StudyBlock | None, datetime]:
@@ -596,22 +768,24 @@ def _process_task_in_window(
     is_critical = current_task.task.priority == TaskPriority.CRITICAL
     min_threshold = 1 if is_critical else 10
     if current_task.remaining_minutes <= min_threshold:
-        tasks.pop(0)
+        tasks.popleft()
         return None, pointer
     
     # Calculate how much time we can allocate in this window
-    window_remaining = window_end - pointer
+    window_seconds = (window_end - pointer).total_seconds()
     
     # If window is too small, skip this window but DON'T remove the task
     # The task will be scheduled in subsequent windows/days
-    if window_remaining <= timedelta(minutes=10):
+    if window_seconds <= 600:
         return None, window_end  # Move pointer to end of window to exit the while loop
     
-    session_length = min(
-        session_cap,
-        timedelta(minutes=current_task.remaining_minutes),
-        window_remaining,
-    )
+    # Work in integer minutes; only the window can cut a session to a partial minute
+    session_minutes = min(session_cap_minutes, current_task.remaining_minutes)
+    if window_seconds < session_minutes * 60:
+        session_length = window_end - pointer
+        session_minutes = int(window_seconds // 60)
+    else:
+        session_length = timedelta(minutes=session_minutes)
     
     session = StudyBlock(
         start_time=pointer,
@@ -624,59 +798,33 @@ def _process_task_in_window(
     )
     
     new_pointer = pointer + session_length + break_duration
-    current_task.remaining_minutes -= int(session_length.total_seconds() // 60)
+    current_task.remaining_minutes -= session_minutes
     
     if current_task.remaining_minutes <= 0:
-        tasks.pop(0)
+        tasks.popleft()
     # NOTE: Removed tasks.sort() here - it was destroying deadline-based ordering
     # The initial sort by _sort_tasks_for_day() should be maintained throughout allocation
     
     return session, new_pointer
 
 
-def _normalize_current_time(current_time: datetime | None) -> datetime | None:
-    """Normalize current_time to UTC-aware datetime."""
-    if not current_time:
-        return None
-    if current_time.tzinfo is None:
-        return current_time.replace(tzinfo=timezone.utc)
-    return current_time.astimezone(timezone.utc)
-
-
 def _calculate_window_pointer(
-    window_start: datetime, window_end: datetime, current_time: datetime | None, user_tz: ZoneInfo | None = None
+    window_start: datetime, window_end: datetime, current_time: datetime | None
 ) -> datetime | None:
-    """Calculate the starting pointer for a window, accounting for current time if window is today.
+    """Calculate the starting pointer for a window, never starting before current time.
+    
+    Windows and current_time share the same naive-UTC timeline, so a plain max()
+    keeps today's windows from starting in the past without any timezone
+    conversion (future windows start after current_time anyway).
     
     Args:
-        window_start: Window start (naive UTC datetime representing local time)
-        window_end: Window end (naive UTC datetime representing local time)
-        current_time: Current time (UTC-aware datetime)
-        user_tz: User's timezone for proper local date comparison
+        window_start: Window start (naive UTC datetime)
+        window_end: Window end (naive UTC datetime)
+        current_time: Current time (naive UTC datetime)
     """
     pointer = window_start
-    if not current_time or not user_tz:
-        if pointer >= window_end:
-            return None
-        return pointer
-    
-    # Convert both to user's local timezone for date comparison
-    window_start_utc = window_start.replace(tzinfo=timezone.utc)
-    window_start_local = window_start_utc.astimezone(user_tz)
-    window_date_local = window_start_local.date()
-    
-    current_time_utc = current_time if current_time.tzinfo else current_time.replace(tzinfo=timezone.utc)
-    current_time_local = current_time_utc.astimezone(user_tz)
-    current_date_local = current_time_local.date()
-    
-    # If window is today in user's local timezone, start from current time (not past)
-    if window_date_local == current_date_local:
-        # Compare times in local timezone
-        if current_time_local >= window_start_local:
-            # Current time is at or past window start - use current time
-            pointer = current_time_utc.replace(tzinfo=None)
-        # Otherwise use window_start (already set)
-    
+    if current_time and current_time > pointer:
+        pointer = current_time
     if pointer >= window_end:
         return None
     return pointer
@@ -684,7 +832,7 @@ def _calculate_window_pointer(
 
 def _allocate_sessions_for_day(
     windows: list[tuple[datetime, datetime]],
-    tasks: list[WeightedTask],
+    tasks: deque[WeightedTask],
     energy_level: EnergyLevel | None,
     user: User,
     current_time: datetime | None = None,
@@ -701,37 +849,35 @@ def _allocate_sessions_for_day(
                      sessions won't be scheduled in the past.
     """
     sessions: list[StudyBlock] = []
+    block_ids: list[int] = []  # Index of the free block each session was placed in
     break_duration = timedelta(minutes=user.break_duration)
-    session_cap = timedelta(minutes=_energy_cap(energy_level, user.max_session_length))
-    current_time = _normalize_current_time(current_time)
-    
-    # Get user timezone for proper date comparison
-    try:
-        user_tz = ZoneInfo(user.timezone)
-    except Exception:
-        user_tz = ZoneInfo("UTC")
+    session_cap_minutes = _energy_cap(energy_level, user.max_session_length)
+    current_time = _normalize_to_utc_aware(current_time) if current_time else None
+    # Compare against windows on their naive UTC timeline
+    now_utc = current_time.replace(tzinfo=None) if current_time else None
     
     # Build task priority map for interleaving (to respect CRITICAL priority)
     task_priorities: dict[int, str] = {
         wt.task.id: wt.task.priority.value for wt in tasks
     }
 
-    for window_start, window_end in windows:
-        pointer = _calculate_window_pointer(window_start, window_end, current_time, user_tz)
+    for block_id, (window_start, window_end) in enumerate(windows):
+        pointer = _calculate_window_pointer(window_start, window_end, now_utc)
         if pointer is None:
             continue
             
         while pointer < window_end and tasks:
             session, pointer = _process_task_in_window(
-                tasks, pointer, window_end, session_cap, break_duration, energy_level
+                tasks, pointer, window_end, session_cap_minutes, break_duration, energy_level
             )
             if session:
                 sessions.append(session)
+                block_ids.append(block_id)
     
-    return interleave_subjects(insert_breaks(sessions, user.break_duration), task_priorities)
+    return _order_sessions_with_breaks(sessions, user.break_duration, task_priorities, block_ids)
 
 
-def _sort_tasks_for_day(tasks: list[WeightedTask], day_date: date, user_tz: str) -> None:
+def _sort_tasks_for_day(tasks: deque[WeightedTask], day_date: date, user_tz: str) -> None:
     """
     Sort tasks in-place so those with deadlines on or before this day come first.
     This ensures urgent tasks don't get pushed past their deadlines.
@@ -743,7 +889,7 @@ def _sort_tasks_for_day(tasks: list[WeightedTask], day_date: date, user_tz: str)
         day_date: The LOCAL date (in user's timezone) we're scheduling for
         user_tz: User's timezone string for proper date comparison
     """
-    tz = ZoneInfo(user_tz)
+    tz = _safe_tz(user_tz)
     
     def deadline_priority(task: WeightedTask) -> tuple[int, float]:
         deadline = task.task.deadline
@@ -762,7 +908,9 @@ def _sort_tasks_for_day(tasks: list[WeightedTask], day_date: date, user_tz: str)
         # Secondary sort by original weight (negated for descending)
         return (is_urgent, -task.weight)
     
-    tasks.sort(key=deadline_priority)
+    ordered = sorted(tasks, key=deadline_priority)
+    tasks.clear()
+    tasks.extend(ordered)
 
 
 def build_weekly_plan(
@@ -772,46 +920,51 @@ def build_weekly_plan(
     energy_by_day: dict[date, EnergyLevel],
     reference: datetime,
 ) -> WeeklyPlan:
-    week_start = _local_day_start(reference, user.timezone)
     user_tz = _safe_tz(user.timezone)
+    week_start_local = _local_midnight(reference, user_tz)
     plans: list[DailyPlan] = []
+    # Tasks are consumed from the front as they are fully scheduled
+    pending = deque(tasks)
+    
+    # Parse preferred study windows once (supports both old and new formats)
+    time_windows = _parse_study_windows(user.preferred_study_windows)
+    constraints_by_day = _bucket_constraints_by_day(constraints, week_start_local.date(), 7, user_tz)
+    # Most weeks contain no DST transition (and many zones never have one), so
+    # window conversion can use a fixed offset; the extra day covers overnight windows
+    utc_offset = _constant_utc_offset(week_start_local, 8)
     
     for offset in range(7):
-        day_start = week_start + timedelta(days=offset)
-        
-        # Get the LOCAL date in user's timezone (not UTC date!)
-        # day_start is naive UTC, convert to user's tz to get correct local date
-        day_start_aware = day_start.replace(tzinfo=timezone.utc)
-        day_date_local = day_start_aware.astimezone(user_tz).date()
+        # Step in local wall-clock time so each day starts at local midnight,
+        # then derive the naive UTC day start used for storage
+        day_start_local = week_start_local + timedelta(days=offset)
+        if utc_offset is not None:
+            day_start = day_start_local.replace(tzinfo=None) - utc_offset
+        else:
+            day_start = day_start_local.astimezone(timezone.utc).replace(tzinfo=None)
+        day_date_local = day_start_local.date()
         
         energy_level = energy_by_day.get(day_date_local)
         
-        # Parse preferred study windows (supports both old and new formats)
-        preferred_windows_raw = user.preferred_study_windows
-        time_windows = _parse_study_windows(preferred_windows_raw)
-        
-        window_ranges = []
-        for start_time, end_time in time_windows:
-            window_ranges.append(
-                _window_to_range(day_start, (start_time, end_time), user.timezone)
-            )
+        window_ranges = [
+            _local_window_to_range(day_start_local, window, utc_offset) for window in time_windows
+        ]
         
         # If no valid windows found, skip this day (don't create sessions outside preferences)
         if not window_ranges:
             plans.append(DailyPlan(day=day_start, sessions=[]))
             continue
 
-        effective_constraints = _extract_constraints_for_day(constraints, day_date_local, user_tz)
+        effective_constraints = constraints_by_day[day_date_local]
         available_blocks = apply_constraints(window_ranges, effective_constraints, user_tz)
         
         # Sort tasks so those with deadlines on/before this day come first
         # This ensures urgent tasks get scheduled before their deadlines
         # Pass user's timezone for proper local date comparison
-        _sort_tasks_for_day(tasks, day_date_local, user.timezone)
+        _sort_tasks_for_day(pending, day_date_local, user.timezone)
         
         sessions = _allocate_sessions_for_day(
             available_blocks,
-            tasks,
+            pending,
             energy_level,
             user,
             current_time=reference,  # Pass reference time to skip past windows
@@ -825,13 +978,6 @@ def build_weekly_plan(
     )
 
 
-def _normalize_to_utc_aware(dt: datetime) -> datetime:
-    """Normalize datetime to UTC-aware."""
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-
 def _calculate_new_deadline(
     deadline: datetime, today_start_local: datetime, tomorrow_start_local: datetime, ref_local: datetime, user_tz: ZoneInfo
 ) -> datetime:
@@ -918,40 +1064,47 @@ def _build_reschedule_summary(
     return "; ".join(summary_parts) if summary_parts else None
 
 
+def _load_schedulable_tasks(db: Session, user: User) -> list[Task]:
+    """Load the user's open, non-template tasks with their subjects in one query."""
+    return (
+        db.query(Task)
+        .options(joinedload(Task.subject))
+        .filter(
+            Task.user_id == user.id,
+            Task.is_completed.is_(False),
+            Task.is_recurring_template.is_(False),
+        )
+        .all()
+    )
+
+
 def _auto_reschedule_overdue_tasks(
     db: Session, user: User, reference: datetime
-) -> dict[str, Any]:
+) -> tuple[dict[str, Any], list[Task]]:
     """
     Automatically reschedule overdue tasks to today or tomorrow.
     
     Uses user's local timezone for date comparisons to ensure accuracy.
     
     Returns:
-        dict with keys:
-        - rescheduled: list of dicts with task info and new deadline
-        - needs_attention: list of very overdue tasks (> 14 days)
-        - summary: human-readable summary string
+        tuple: (rescheduling_info, tasks)
+        - rescheduling_info: dict with keys:
+            - rescheduled: list of dicts with task info and new deadline
+            - needs_attention: list of very overdue tasks (> 14 days)
+            - summary: human-readable summary string
+        - tasks: the user's open, non-template tasks (subjects loaded), reusable
+          by the caller instead of querying them again
     """
-    from zoneinfo import ZoneInfo
-    
     ref = _normalize_to_utc_aware(reference)
-    try:
-        user_tz = ZoneInfo(user.timezone) if user.timezone else ZoneInfo("UTC")
-    except Exception:
-        user_tz = ZoneInfo("UTC")
+    user_tz = _safe_tz(user.timezone)
     
     # Get today in user's local timezone (not UTC!)
     ref_local = ref.astimezone(user_tz)
     today_local = ref_local.date()
     today_start_local = datetime.combine(today_local, time.min, tzinfo=user_tz)
-    tomorrow_start_local = today_start_local + timedelta(days=1)
+    tomorrow_start_local = today_start_local + ONE_DAY
     
-    all_tasks = db.query(Task).filter(
-        Task.user_id == user.id,
-        Task.is_completed.is_(False),
-        Task.is_recurring_template.is_(False),
-        Task.deadline.isnot(None),
-    ).all()
+    all_tasks = _load_schedulable_tasks(db, user)
     
     rescheduled_tasks = []
     needs_attention_tasks = []
@@ -997,6 +1150,9 @@ def _auto_reschedule_overdue_tasks(
     
     if rescheduled_tasks:
         db.commit()
+        # Committing expires every loaded task; reload them in one query rather
+        # than letting each one refresh itself lazily
+        all_tasks = _load_schedulable_tasks(db, user)
     
     # Use local date for summary (matching the date comparison logic above)
     summary = _build_reschedule_summary(rescheduled_tasks, needs_attention_tasks, today_local, user_tz)
@@ -1005,7 +1161,7 @@ def _auto_reschedule_overdue_tasks(
         "rescheduled": rescheduled_tasks,
         "needs_attention": needs_attention_tasks,
         "summary": summary,
-    }
+    }, all_tasks
 
 
 def generate_weekly_schedule(
@@ -1021,13 +1177,14 @@ def generate_weekly_schedule(
     """
     ref = reference or datetime.now(timezone.utc)
     
-    # Auto-reschedule overdue tasks before generating schedule
-    rescheduling_info = _auto_reschedule_overdue_tasks(db, user, ref)
-    
-    subjects: list[Subject] = (
-        db.query(Subject).filter(Subject.user_id == user.id).all()
+    # Auto-reschedule overdue tasks before generating schedule; this also loads
+    # the tasks to schedule (with their subjects), so they aren't queried twice.
+    # Only subjects that have tasks can influence weights, so no separate
+    # Subject query is needed.
+    rescheduling_info, tasks = _auto_reschedule_overdue_tasks(db, user, ref)
+    subjects: list[Subject] = list(
+        {task.subject.id: task.subject for task in tasks if task.subject}.values()
     )
-    tasks: list[Task] = db.query(Task).filter(Task.user_id == user.id).all()
     constraints: list[ScheduleConstraint] = (
         db.query(ScheduleConstraint)
         .filter(ScheduleConstraint.user_id == user.id)
@@ -1084,27 +1241,28 @@ def micro_plan(
     }
 
     allocation: list[StudyBlock] = []
-    remaining = timedelta(minutes=minutes)
-    session_cap = timedelta(minutes=_energy_cap(energy_level, user.max_session_length))
+    # Track time budgets as integer minutes; only the pointer needs datetime math
+    remaining = minutes
+    session_cap_minutes = _energy_cap(energy_level, user.max_session_length)
+    break_duration = timedelta(minutes=user.break_duration)
     pointer = ref
 
-    while remaining > timedelta(minutes=5) and weighted:
-        current = weighted[0]
+    pending = deque(weighted)
+
+    while remaining > 5 and pending:
+        current = pending[0]
         
         # Check if task has very little remaining time - remove it
         if current.remaining_minutes <= 10:
-            weighted.pop(0)
+            pending.popleft()
             continue
         
         # Check if user's remaining time is too small - stop allocating
-        if remaining <= timedelta(minutes=10):
+        if remaining <= 10:
             break
         
-        session_length = min(
-            session_cap,
-            timedelta(minutes=current.remaining_minutes),
-            remaining,
-        )
+        session_minutes = min(session_cap_minutes, current.remaining_minutes, remaining)
+        session_length = timedelta(minutes=session_minutes)
         
         allocation.append(
             StudyBlock(
@@ -1117,13 +1275,13 @@ def micro_plan(
                 generated_by="micro",
             )
         )
-        pointer += session_length + timedelta(minutes=user.break_duration)
-        remaining -= session_length
-        current.remaining_minutes -= int(session_length.total_seconds() // 60)
+        pointer += session_length + break_duration
+        remaining -= session_minutes
+        current.remaining_minutes -= session_minutes
+        # sort_index is fixed at construction, so the list stays ordered as
+        # remaining_minutes drops; no re-sort needed after each session
         if current.remaining_minutes <= 0:
-            weighted.pop(0)
-        else:
-            weighted.sort()
+            pending.popleft()
 
     return interleave_subjects(allocation, task_priorities)
 
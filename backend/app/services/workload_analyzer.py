@@ -6,10 +6,17 @@ It does not modify any data - only analyzes and provides warnings.
 
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import date, datetime, timedelta, timezone
-from typing import Any
+import copy
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from time import monotonic
+from typing import Any, Sequence
+from zoneinfo import ZoneInfo
 
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
 from app.models.constraint import ScheduleConstraint
@@ -18,36 +25,93 @@ from app.models.subject import Subject
 from app.models.task import Task
 from app.models.user import User
 from app.schemas.schedule import WeeklyPlan
-from app.services.scheduling import _parse_study_windows, _window_to_range, _local_day_start, apply_constraints
+from app.services.scheduling import (
+    _local_day_start,
+    _parse_frozen_study_windows,
+    _parse_study_windows,
+    _safe_tz,
+    _study_windows_key,
+    _to_local_date,
+    _window_to_range,
+    _windows_fully_blocked,
+)
 
 # Constants
 EXTEND_DEADLINES_SUGGESTION = "Extend deadlines for lower-priority tasks"
+# Indexed by date.weekday(); avoids locale-dependent strftime("%A") per day
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Pre-generation results are reused for repeated requests (e.g. UI polling) while
+# the user's data is unchanged; the TTL bounds drift from the moving "now".
+# Bounded LRU keyed by user id: (data version, expiry, result)
+PRE_GENERATION_CACHE_TTL_SECONDS = 60
+PRE_GENERATION_CACHE_MAX_USERS = 256
+_pre_generation_cache: OrderedDict[int, tuple[tuple, float, dict[str, Any]]] = OrderedDict()
+# Sync routes run in a threadpool; every read and write of the cache holds this lock
+_pre_generation_cache_lock = threading.Lock()
+
+# Task columns the analysis reads; selecting just these skips the wide text/JSON
+# columns and per-row ORM instance setup (rows expose the same attribute names)
+ANALYSIS_TASK_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.estimated_minutes,
+    Task.deadline,
+    Task.priority,
+    Task.subject_id,
+    Task.is_completed,
+)
+
+
+def _normalize_to_utc(dt: datetime) -> datetime:
+    """Normalize datetime to UTC."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _window_minutes(start: time, end: time) -> int:
+    """Length of a daily time range in minutes; an end before the start wraps past midnight."""
+    minutes = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+    return minutes + 24 * 60 if minutes < 0 else minutes
+
+
+def _sum_window_minutes(time_windows: Sequence[tuple[time, time]]) -> int | None:
+    """Total minutes of study windows per day, or None when there are no windows."""
+    if not time_windows:
+        return None
+    return sum(_window_minutes(start_time, end_time) for start_time, end_time in time_windows)
+
+
+@lru_cache(maxsize=1024)
+def _study_minutes_per_day_for_key(key: tuple) -> int | None:
+    return _sum_window_minutes(_parse_frozen_study_windows(key))
+
+
+def _study_minutes_per_day(preferred_windows_raw: Any) -> int | None:
+    """Minutes of study windows per day, memoized on the window configuration itself."""
+    key = _study_windows_key(preferred_windows_raw)
+    if key is None:
+        return _sum_window_minutes(_parse_study_windows(preferred_windows_raw))
+    return _study_minutes_per_day_for_key(key)
 
 
 def _calculate_available_hours_from_windows(
     user: User
 ) -> dict[str, Any]:
     """Calculate available study hours from preferred study windows."""
-    preferred_windows_raw = user.preferred_study_windows
-    time_windows = _parse_study_windows(preferred_windows_raw)
+    minutes_per_day = _study_minutes_per_day(user.preferred_study_windows)
     
-    if not time_windows:
+    if minutes_per_day is None:
         return {
             "total_hours_per_week": 0,
             "hours_per_day": 0,
             "has_windows": False,
         }
     
-    # Calculate hours per day
-    hours_per_day = 0
-    for start_time, end_time in time_windows:
-        start_hour = start_time.hour + start_time.minute / 60
-        end_hour = end_time.hour + end_time.minute / 60
-        if end_hour < start_hour:  # Overnight window
-            end_hour += 24
-        hours_per_day += (end_hour - start_hour)
-    
-    total_hours_per_week = hours_per_day * 7
+    # Whole minutes per day; convert to hours only for the result
+    hours_per_day = minutes_per_day / 60
+    total_hours_per_week = minutes_per_day * 7 / 60
     
     return {
         "total_hours_per_week": total_hours_per_week,
@@ -61,52 +125,48 @@ def _calculate_constraint_impact(
 ) -> dict[str, Any]:
     # reference is used in _local_day_start call below
     """Calculate how constraints reduce available time."""
-    from zoneinfo import ZoneInfo
-    
     week_start = _local_day_start(reference, user.timezone)
-    user_tz = ZoneInfo(user.timezone)
+    user_tz = _safe_tz(user.timezone)
     
-    total_blocked_hours = 0
+    total_blocked_minutes = 0
     constraint_details = []
     
+    # Only constraints with a daily time range block time. Compute each one's
+    # minutes once and bucket it by the LOCAL date / weekdays it applies to
+    timed_constraints: list[tuple[str, int]] = []
+    by_date: dict[date, list[int]] = defaultdict(list)
+    by_weekday: dict[int, list[int]] = defaultdict(list)
+    for constraint in constraints:
+        if not (constraint.start_time and constraint.end_time):
+            continue
+        index = len(timed_constraints)
+        timed_constraints.append((constraint.name, _window_minutes(constraint.start_time, constraint.end_time)))
+        if constraint.start_datetime:
+            # Constraint datetime in user's timezone for proper date comparison
+            by_date[_to_local_date(constraint.start_datetime, user_tz)].append(index)
+        if constraint.is_recurring:
+            for weekday in set(constraint.days_of_week or ()):
+                by_weekday[weekday].append(index)
+    
     for offset in range(7):
         day_start = week_start + timedelta(days=offset)
         # Convert to user's timezone to get correct LOCAL date
-        day_start_aware = day_start.replace(tzinfo=timezone.utc)
-        day_date = day_start_aware.astimezone(user_tz).date()
+        day_date = _to_local_date(day_start, user_tz)
+        day_name = WEEKDAY_NAMES[day_date.weekday()]
         
-        def constraint_applies_to_day(c: ScheduleConstraint) -> bool:
-            """Check if constraint applies to this day, using proper timezone conversion."""
-            if c.start_datetime:
-                # Convert constraint datetime to user's timezone for proper date comparison
-                c_dt = c.start_datetime
-                if c_dt.tzinfo is None:
-                    c_dt = c_dt.replace(tzinfo=timezone.utc)
-                c_local_date = c_dt.astimezone(user_tz).date()
-                if c_local_date == day_date:
-                    return True
-            if c.start_time and c.is_recurring and day_date.weekday() in (c.days_of_week or []):
-                return True
-            return False
-        
-        day_constraints = [c for c in constraints if constraint_applies_to_day(c)]
-        
-        for constraint in day_constraints:
-            if constraint.start_time and constraint.end_time:
-                start_hour = constraint.start_time.hour + constraint.start_time.minute / 60
-                end_hour = constraint.end_time.hour + constraint.end_time.minute / 60
-                if end_hour < start_hour:
-                    end_hour += 24
-                blocked_hours = end_hour - start_hour
-                total_blocked_hours += blocked_hours
-                constraint_details.append({
-                    "name": constraint.name,
-                    "day": day_date.strftime("%A"),
-                    "hours": blocked_hours,
-                })
+        # A constraint matching both its date and weekday still counts once
+        day_indices = set(by_date.get(day_date, ())).union(by_weekday.get(day_date.weekday(), ()))
+        for index in sorted(day_indices):
+            name, blocked_minutes = timed_constraints[index]
+            total_blocked_minutes += blocked_minutes
+            constraint_details.append({
+                "name": name,
+                "day": day_name,
+                "hours": blocked_minutes / 60,
+            })
     
     return {
-        "total_blocked_hours_per_week": total_blocked_hours,
+        "total_blocked_hours_per_week": total_blocked_minutes / 60,
         "constraints": constraint_details,
     }
 
@@ -117,24 +177,22 @@ def _calculate_historical_completion_rate(
     """Calculate historical completion rate from past sessions."""
     cutoff_date = datetime.now(timezone.utc) - timedelta(weeks=weeks)
     
-    sessions = (
-        db.query(StudySession)
+    # Count in the database instead of loading every session row
+    total_sessions, completed_sessions = (
+        db.query(
+            func.count(StudySession.id),
+            func.sum(case((StudySession.status == SessionStatus.COMPLETED, 1), else_=0)),
+        )
         .filter(
             StudySession.user_id == user_id,
             StudySession.start_time >= cutoff_date,
         )
-        .all()
+        .one()
     )
     
-    if not sessions:
+    if not total_sessions:
         return 0.65  # Research-based default if no history
     
-    total_sessions = len(sessions)
-    completed_sessions = len([s for s in sessions if s.status == SessionStatus.COMPLETED])
-    
-    if total_sessions == 0:
-        return 0.65
-    
     completion_rate = completed_sessions / total_sessions
     
     # Apply slight conservatism for newer users
@@ -144,36 +202,61 @@ def _calculate_historical_completion_rate(
     return max(0.5, min(0.95, completion_rate))  # Clamp between 50% and 95%
 
 
-def _detect_deadline_risks(
-    tasks: list[Task], available_hours_per_week: float, reference: datetime
-) -> list[dict[str, Any]]:
-    """Detect tasks that may not be completed before deadline."""
-    if reference.tzinfo is None:
-        ref = reference.replace(tzinfo=timezone.utc)
-    else:
-        ref = reference.astimezone(timezone.utc)
+@dataclass(frozen=True, slots=True)
+class TaskInfo:
+    """An open task with the values the pre-generation checks need, computed once."""
+    task: Task
+    hours: float
+    deadline_utc: datetime | None
+    days_until: int | None  # Whole days from the reference date to the deadline date (UTC)
+
+
+def _preprocess_tasks(tasks: list[Task], reference: datetime) -> list[TaskInfo]:
+    """
+    Normalize deadlines and compute hours for every open task in a single pass.
     
-    risks = []
+    Accepts Task instances or rows selected with ANALYSIS_TASK_COLUMNS.
+    """
+    ref_date = _normalize_to_utc(reference).date()
     
+    infos = []
     for task in tasks:
-        if not task.deadline or task.is_completed:
+        if task.is_completed:
             continue
-        
-        # Normalize deadline to UTC
         deadline = task.deadline
-        if deadline.tzinfo is None:
-            deadline = deadline.replace(tzinfo=timezone.utc)
+        if deadline:
+            deadline = _normalize_to_utc(deadline)
+            days_until = (deadline.date() - ref_date).days
         else:
-            deadline = deadline.astimezone(timezone.utc)
-        
-        # Calculate days until deadline
-        days_until = (deadline.date() - ref.date()).days
+            deadline = None
+            days_until = None
+        infos.append(TaskInfo(task, task.estimated_minutes / 60, deadline, days_until))
+    return infos
+
+
+def _detect_deadline_issues(
+    task_infos: list[TaskInfo], available_hours_per_week: float
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Detect deadline risks and deadline clusters in a single pass over the tasks.
+    
+    Returns:
+        (risks, clusters): tasks that may not be completed before their deadline,
+        and days within the next week on which 3+ tasks are due
+    """
+    risks = []
+    # Tasks due within the next week, bucketed by deadline date as they are seen
+    upcoming_by_date: defaultdict[date, list[TaskInfo]] = defaultdict(list)
+    
+    for info in task_infos:
+        days_until = info.days_until
+        if days_until is None or days_until < 0:
+            continue  # No deadline, or already overdue (handled by auto-reschedule)
         
-        if days_until < 0:
-            continue  # Already overdue (handled by auto-reschedule)
+        if days_until <= 7:  # Within next week
+            upcoming_by_date[info.deadline_utc.date()].append(info)
         
-        # Calculate hours needed
-        hours_needed = task.estimated_minutes / 60
+        hours_needed = info.hours
         
         # Estimate available hours before deadline (proportional to days)
         days_available = min(days_until, 7)  # Cap at 7 days
@@ -182,84 +265,49 @@ def _detect_deadline_risks(
         # Check if task can be completed
         if hours_needed > hours_available_before_deadline:
             risks.append({
-                "task_id": task.id,
-                "task_title": task.title,
+                "task_id": info.task.id,
+                "task_title": info.task.title,
                 "hours_needed": hours_needed,
                 "hours_available": hours_available_before_deadline,
                 "hours_short": hours_needed - hours_available_before_deadline,
                 "days_until_deadline": days_until,
-                "deadline": deadline.isoformat(),
+                "deadline": info.deadline_utc.isoformat(),
             })
     
-    return risks
-
-
-def _detect_deadline_clustering(
-    tasks: list[Task], reference: datetime
-) -> list[dict[str, Any]]:
-    """Detect multiple tasks due on the same day."""
-    if reference.tzinfo is None:
-        ref = reference.replace(tzinfo=timezone.utc)
-    else:
-        ref = reference.astimezone(timezone.utc)
-    
-    # Group tasks by deadline date
-    deadline_groups = defaultdict(list)
-    
-    for task in tasks:
-        if not task.deadline or task.is_completed:
-            continue
-        
-        deadline = task.deadline
-        if deadline.tzinfo is None:
-            deadline = deadline.replace(tzinfo=timezone.utc)
-        else:
-            deadline = deadline.astimezone(timezone.utc)
-        
-        deadline_date = deadline.date()
-        days_until = (deadline_date - ref.date()).days
-        
-        if 0 <= days_until <= 7:  # Within next week
-            deadline_groups[deadline_date].append({
-                "task_id": task.id,
-                "task_title": task.title,
-                "hours": task.estimated_minutes / 60,
-                "priority": task.priority.value,
-            })
-    
-    # Find clusters (3+ tasks on same day)
-    clusters = []
-    for deadline_date, task_list in deadline_groups.items():
-        if len(task_list) >= 3:
-            total_hours = sum(t["hours"] for t in task_list)
-            clusters.append({
-                "deadline_date": deadline_date.isoformat(),
-                "deadline_day": deadline_date.strftime("%A"),
-                "task_count": len(task_list),
-                "total_hours": total_hours,
-                "tasks": task_list,
-            })
+    # Clusters are days with 3+ tasks due; only those buckets are expanded
+    clusters = [
+        {
+            "deadline_date": deadline_date.isoformat(),
+            "deadline_day": WEEKDAY_NAMES[deadline_date.weekday()],
+            "task_count": len(infos),
+            "total_hours": sum(info.hours for info in infos),
+            "tasks": [
+                {
+                    "task_id": info.task.id,
+                    "task_title": info.task.title,
+                    "hours": info.hours,
+                    "priority": info.task.priority.value,
+                }
+                for info in infos
+            ],
+        }
+        for deadline_date, infos in upcoming_by_date.items()
+        if len(infos) >= 3
+    ]
     
-    return clusters
+    return risks, clusters
 
 
 def _check_exam_prep(
-    subjects: list[Subject], tasks: list[Task], reference: datetime, user_tz_str: str = "UTC"
+    subjects: list[Subject], task_infos: list[TaskInfo], reference: datetime, user_tz_str: str = "UTC"
 ) -> list[dict[str, Any]]:
     """Check if subjects with upcoming exams have prep scheduled."""
-    from zoneinfo import ZoneInfo
-    
-    if reference.tzinfo is None:
-        ref = reference.replace(tzinfo=timezone.utc)
-    else:
-        ref = reference.astimezone(timezone.utc)
-    
     # Get reference date in user's local timezone for proper comparison
-    try:
-        user_tz = ZoneInfo(user_tz_str)
-        ref_local_date = ref.astimezone(user_tz).date()
-    except Exception:
-        ref_local_date = ref.date()
+    # (_safe_tz falls back to UTC for an invalid timezone)
+    ref_local_date = _normalize_to_utc(reference).astimezone(_safe_tz(user_tz_str)).date()
+    
+    # Subjects that already have open tasks count as prepared
+    subjects_with_tasks = {info.task.subject_id for info in task_infos}
     
     missing_prep = []
     
@@ -270,21 +318,40 @@ def _check_exam_prep(
         days_until_exam = (subject.exam_date - ref_local_date).days
         
         # Check if exam is in next 2-4 weeks
-        if 14 <= days_until_exam <= 28:
-            # Check if there are tasks for this subject
-            subject_tasks = [t for t in tasks if t.subject_id == subject.id and not t.is_completed]
-            
-            if not subject_tasks:
-                missing_prep.append({
-                    "subject_id": subject.id,
-                    "subject_name": subject.name,
-                    "exam_date": subject.exam_date.isoformat(),
-                    "days_until_exam": days_until_exam,
-                })
+        if 14 <= days_until_exam <= 28 and subject.id not in subjects_with_tasks:
+            missing_prep.append({
+                "subject_id": subject.id,
+                "subject_name": subject.name,
+                "exam_date": subject.exam_date.isoformat(),
+                "days_until_exam": days_until_exam,
+            })
     
     return missing_prep
 
 
+def _pre_generation_data_version(db: Session, user: User, ref: datetime) -> tuple:
+    """
+    Fingerprint everything analyze_pre_generation reads, in a single query.
+    
+    Row counts catch deletions, which do not move MAX(updated_at).
+    """
+    def count_and_latest(model) -> tuple:
+        return (
+            select(func.count(model.id)).where(model.user_id == user.id).scalar_subquery(),
+            select(func.max(model.updated_at)).where(model.user_id == user.id).scalar_subquery(),
+        )
+    
+    row = db.execute(
+        select(
+            *count_and_latest(Task),
+            *count_and_latest(Subject),
+            *count_and_latest(ScheduleConstraint),
+            *count_and_latest(StudySession),
+        )
+    ).one()
+    return (user.updated_at, _normalize_to_utc(ref).date(), *row)
+
+
 def analyze_pre_generation(
     db: Session, user: User, reference: datetime | None = None
 ) -> dict[str, Any]:
@@ -297,12 +364,54 @@ def analyze_pre_generation(
     3. burnout_risk - Too many heavy days (only in post-gen)
     4. exam_prep_needed - Exam coming with no prep
     5. deadline_cluster - Multiple deadlines same day
-    """
-    ref = reference or datetime.now(timezone.utc)
     
+    Calls without an explicit reference are cached per user for a short TTL and
+    reused while the user's tasks, subjects, constraints and sessions are unchanged.
+    """
+    if reference is not None:
+        return _analyze_pre_generation(db, user, reference)
+    
+    ref = datetime.now(timezone.utc)
+    version = _pre_generation_data_version(db, user, ref)
+    now = monotonic()
+    cached_result = _get_cached_pre_generation_result(user.id, version, now)
+    if cached_result is not None:
+        return copy.deepcopy(cached_result)
+    
+    result = _analyze_pre_generation(db, user, ref)
+    _store_pre_generation_result(user.id, version, now, result)
+    return result
+
+
+def _get_cached_pre_generation_result(user_id: int, version: tuple, now: float) -> dict[str, Any] | None:
+    """Return the cached result if it is current and unexpired, marking it recently used."""
+    with _pre_generation_cache_lock:
+        cached = _pre_generation_cache.get(user_id)
+        if cached is None or cached[0] != version or cached[1] <= now:
+            return None
+        _pre_generation_cache.move_to_end(user_id)
+        # Stored results are private copies that are never mutated, so the caller
+        # can copy this one after the lock is released
+        return cached[2]
+
+
+def _store_pre_generation_result(user_id: int, version: tuple, now: float, result: dict[str, Any]) -> None:
+    """Cache a result, dropping expired entries and evicting the least recently used past the size cap."""
+    entry = (version, now + PRE_GENERATION_CACHE_TTL_SECONDS, copy.deepcopy(result))
+    with _pre_generation_cache_lock:
+        for expired_id in [key for key, (_, expires_at, _) in _pre_generation_cache.items() if expires_at <= now]:
+            del _pre_generation_cache[expired_id]
+        _pre_generation_cache[user_id] = entry
+        _pre_generation_cache.move_to_end(user_id)
+        while len(_pre_generation_cache) > PRE_GENERATION_CACHE_MAX_USERS:
+            _pre_generation_cache.popitem(last=False)
+
+
+def _analyze_pre_generation(db: Session, user: User, ref: datetime) -> dict[str, Any]:
+    """Run the pre-generation analysis against the current database state."""
     # Fetch data
     tasks = (
-        db.query(Task)
+        db.query(*ANALYSIS_TASK_COLUMNS)
         .filter(
             Task.user_id == user.id,
             Task.is_completed.is_(False),
@@ -311,9 +420,10 @@ def analyze_pre_generation(
         .all()
     )
     
+    # Subjects only feed the exam-prep check, which needs an exam date
     subjects = (
-        db.query(Subject)
-        .filter(Subject.user_id == user.id)
+        db.query(Subject.id, Subject.name, Subject.exam_date)
+        .filter(Subject.user_id == user.id, Subject.exam_date.isnot(None))
         .all()
     )
     
@@ -336,14 +446,14 @@ def analyze_pre_generation(
     
     # Calculate task hours
     total_task_hours = sum(task.estimated_minutes for task in tasks) / 60
+    task_infos = _preprocess_tasks(tasks, ref)
     
     # Calculate realistic capacity (what user actually completes)
     realistic_capacity = user.weekly_study_hours * completion_rate
     
     # Detect issues
-    deadline_risks = _detect_deadline_risks(tasks, window_hours, ref)
-    deadline_clusters = _detect_deadline_clustering(tasks, ref)
-    exam_prep_missing = _check_exam_prep(subjects, tasks, ref, user.timezone)
+    deadline_risks, deadline_clusters = _detect_deadline_issues(task_infos, window_hours)
+    exam_prep_missing = _check_exam_prep(subjects, task_infos, ref, user.timezone)
     
     # Generate simplified warnings
     warnings = []
@@ -451,27 +561,33 @@ def analyze_pre_generation(
     }
 
 
-def _collect_schedule_data(plan: WeeklyPlan) -> tuple[dict[date, float], set[int]]:
-    """Collect scheduled hours per day and scheduled task IDs."""
+def _collect_schedule_data(
+    plan: WeeklyPlan, user_tz: ZoneInfo | None = None
+) -> tuple[dict[date, float], dict[int, datetime]]:
+    """
+    Collect scheduled hours per day and, for each scheduled task, the end of its
+    last session, in a single pass over the plan's sessions.
+    
+    Days are keyed by their LOCAL date in user_tz: plan days start at local
+    midnight stored as UTC, so around a DST change two of them can share a UTC date.
+    The keys of the second mapping are the scheduled task IDs.
+    """
     daily_scheduled_hours = {}
-    scheduled_task_ids = set()
+    task_last_session: dict[int, datetime] = {}
     
     for day_plan in plan.days:
-        if isinstance(day_plan.day, datetime):
-            day_date = day_plan.day.date()
-        else:
-            day_date = day_plan.day
-        total_minutes = sum(
-            int((block.end_time - block.start_time).total_seconds() // 60)
-            for block in day_plan.sessions
-        )
-        daily_scheduled_hours[day_date] = total_minutes / 60
-        
+        # DailyPlan.day is validated as a datetime (plain dates are coerced to midnight)
+        day_date = _to_local_date(day_plan.day, user_tz)
+        # One pass per day: whole minutes per block, and the tasks they belong to
+        total_minutes = 0
         for block in day_plan.sessions:
-            if block.task_id:
-                scheduled_task_ids.add(block.task_id)
+            total_minutes += int((block.end_time - block.start_time).total_seconds() // 60)
+            task_id = block.task_id
+            if task_id:
+                task_last_session[task_id] = max(task_last_session.get(task_id, block.end_time), block.end_time)
+        daily_scheduled_hours[day_date] = total_minutes / 60
     
-    return daily_scheduled_hours, scheduled_task_ids
+    return daily_scheduled_hours, task_last_session
 
 
 def _check_day_overloads(
@@ -482,7 +598,7 @@ def _check_day_overloads(
     for day_date, scheduled_hours in daily_scheduled_hours.items():
         if scheduled_hours > hours_per_day:
             day_overloads.append({
-                "day": day_date.strftime("%A"),
+                "day": WEEKDAY_NAMES[day_date.weekday()],
                 "scheduled_hours": scheduled_hours,
                 "available_hours": hours_per_day,
                 "overflow": scheduled_hours - hours_per_day,
@@ -554,9 +670,9 @@ def _check_schedule_imbalance(daily_scheduled_hours: dict[date, float]) -> list[
         "type": "schedule_imbalance",
         "severity": "soft",
         "title": "Schedule Imbalance",
-        "message": f"{max_day[0].strftime('%A')} ({max_hours:.1f}h) vs {min_day[0].strftime('%A')} ({min_hours:.1f}h) = {imbalance_ratio:.1f}x difference.",
+        "message": f"{WEEKDAY_NAMES[max_day[0].weekday()]} ({max_hours:.1f}h) vs {WEEKDAY_NAMES[min_day[0].weekday()]} ({min_hours:.1f}h) = {imbalance_ratio:.1f}x difference.",
         "suggestions": [
-            f"Redistribute: Move {((max_hours - min_hours) / 2):.1f} hours from {max_day[0].strftime('%A')} to {min_day[0].strftime('%A')}",
+            f"Redistribute: Move {((max_hours - min_hours) / 2):.1f} hours from {WEEKDAY_NAMES[max_day[0].weekday()]} to {WEEKDAY_NAMES[min_day[0].weekday()]}",
             "Or spread workload more evenly across the week",
         ],
     }]
@@ -589,7 +705,7 @@ def _check_consecutive_heavy_days(daily_scheduled_hours: dict[date, float]) -> l
         "severity": "soft",
         "title": "Consecutive Heavy Days",
         "message": f"{len(longest_streak)} consecutive heavy days ({total_hours:.1f}h total) - burnout risk.",
-        "days": [d.strftime("%A") for d, _ in longest_streak],
+        "days": [WEEKDAY_NAMES[d.weekday()] for d, _ in longest_streak],
         "suggestions": [
             f"Redistribute: Move {total_hours / len(longest_streak):.1f} hours to lighter days",
             "Add buffer days between heavy days",
@@ -597,29 +713,14 @@ def _check_consecutive_heavy_days(daily_scheduled_hours: dict[date, float]) -> l
     }]
 
 
-def _normalize_to_utc(dt: datetime) -> datetime:
-    """Normalize datetime to UTC."""
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-
 def _check_tight_deadlines(
-    plan: WeeklyPlan, all_tasks: list[Task]
+    task_last_session: dict[int, datetime], all_tasks: list[Task]
 ) -> list[dict[str, Any]]:
-    """Check for tasks scheduled too close to deadline."""
-    task_last_session = {}
-    for day_plan in plan.days:
-        for block in day_plan.sessions:
-            if block.task_id:
-                task_last_session[block.task_id] = max(
-                    task_last_session.get(block.task_id, block.end_time),
-                    block.end_time
-                )
-    
+    """Check for tasks scheduled too close to deadline (task_last_session from _collect_schedule_data)."""
+    tasks_by_id = {t.id: t for t in all_tasks}
     tight_deadlines = []
     for task_id, last_session_end in task_last_session.items():
-        task = next((t for t in all_tasks if t.id == task_id), None)
+        task = tasks_by_id.get(task_id)
         if not task or not task.deadline:
             continue
         
@@ -667,70 +768,79 @@ def _check_constraints_blocking_all_time(
     if not constraints:
         return []
     
+    # Study windows are the same every day; without any there is nothing to block
+    time_windows = _parse_study_windows(user.preferred_study_windows)
+    if not time_windows:
+        return []
+    
+    user_tz = _safe_tz(user.timezone)
+    
+    # Index the plan by LOCAL date (first entry wins, as a linear search would)
+    plan_by_date = {}
+    for d in plan.days:
+        plan_by_date.setdefault(_to_local_date(d.day, user_tz), d)
+    
     blocked_days = []
     week_start = _local_day_start(reference, user.timezone)
-    from zoneinfo import ZoneInfo
-    user_tz = ZoneInfo(user.timezone)
+    
+    # Resolve which days each constraint covers once: recurring constraints by a
+    # weekday bitmask (bit i = weekday i), one-time constraints by their LOCAL date range
+    day_rules: list[tuple[ScheduleConstraint, int | None, date | None, date | None]] = []
+    for constraint in constraints:
+        if constraint.is_recurring:
+            if constraint.days_of_week:
+                weekday_mask = 0
+                for weekday in constraint.days_of_week:
+                    if 0 <= weekday <= 6:  # days_of_week is not range-validated
+                        weekday_mask |= 1 << weekday
+                day_rules.append((constraint, weekday_mask, None, None))
+        elif constraint.start_datetime and constraint.end_datetime:
+            # Convert constraint datetimes to user's timezone for proper comparison
+            day_rules.append((
+                constraint,
+                None,
+                _to_local_date(constraint.start_datetime, user_tz),
+                _to_local_date(constraint.end_datetime, user_tz),
+            ))
     
     for offset in range(7):
         day_start = week_start + timedelta(days=offset)
         # Convert to user's timezone to get correct LOCAL date
-        day_start_aware = day_start.replace(tzinfo=timezone.utc)
-        day_date = day_start_aware.astimezone(user_tz).date()
-        
-        # Check if this day has study windows configured
-        preferred_windows_raw = user.preferred_study_windows
-        time_windows = _parse_study_windows(preferred_windows_raw)
-        
-        if not time_windows:
-            continue  # No windows configured, skip
+        day_date = _to_local_date(day_start, user_tz)
         
         # Convert windows to datetime ranges
         window_ranges = []
         for start_time, end_time in time_windows:
             window_ranges.append(
-                _window_to_range(day_start, (start_time, end_time), user.timezone)
+                _window_to_range(day_start, (start_time, end_time), user_tz)
             )
         
         if not window_ranges:
             continue  # No valid windows, skip
         
         # Check constraints for this day
-        effective_constraints = []
-        weekday = day_date.weekday()
-        for constraint in constraints:
-            if constraint.is_recurring:
-                if constraint.days_of_week and weekday in constraint.days_of_week:
-                    effective_constraints.append(constraint)
-            else:
-                if constraint.start_datetime and constraint.end_datetime:
-                    # Convert constraint datetimes to user's timezone for proper comparison
-                    c_start = constraint.start_datetime
-                    c_end = constraint.end_datetime
-                    if c_start.tzinfo is None:
-                        c_start = c_start.replace(tzinfo=timezone.utc)
-                    if c_end.tzinfo is None:
-                        c_end = c_end.replace(tzinfo=timezone.utc)
-                    c_start_local = c_start.astimezone(user_tz).date()
-                    c_end_local = c_end.astimezone(user_tz).date()
-                    if c_start_local <= day_date <= c_end_local:
-                        effective_constraints.append(constraint)
+        weekday_bit = 1 << day_date.weekday()
+        effective_constraints = [
+            constraint
+            for constraint, weekday_mask, first_date, last_date in day_rules
+            if (weekday_mask & weekday_bit if weekday_mask is not None else first_date <= day_date <= last_date)
+        ]
         
         if not effective_constraints:
             continue  # No constraints for this day
         
         # Check if all windows are blocked
-        available_blocks = apply_constraints(window_ranges, effective_constraints, user_tz)
+        all_blocked = _windows_fully_blocked(window_ranges, effective_constraints, user_tz)
         
         # Check if this day has no sessions in the plan
-        day_plan = next((d for d in plan.days if isinstance(d.day, datetime) and d.day.date() == day_date or isinstance(d.day, date) and d.day == day_date), None)
-        has_sessions = day_plan and len(day_plan.sessions) > 0
+        day_plan = plan_by_date.get(day_date)
+        has_sessions = bool(day_plan and day_plan.sessions)
         
         # If windows exist but all are blocked and no sessions were created, it's a problem
-        if available_blocks == [] and not has_sessions:
+        if all_blocked and not has_sessions:
             constraint_names = [c.name for c in effective_constraints]
             blocked_days.append({
-                "day": day_date.strftime("%A"),
+                "day": WEEKDAY_NAMES[day_date.weekday()],
                 "date": day_date.isoformat(),
                 "constraints": constraint_names,
             })
@@ -767,34 +877,50 @@ def analyze_post_generation(
     3. burnout_risk - Too many heavy days in a row
     """
     ref = reference or datetime.now(timezone.utc)
-    all_tasks = (
-        db.query(Task)
-        .filter(
-            Task.user_id == user.id,
-            Task.is_completed.is_(False),
-            Task.is_recurring_template.is_(False),
+    window_info = _calculate_available_hours_from_windows(user)
+    daily_scheduled_hours, task_last_session = _collect_schedule_data(plan, _safe_tz(user.timezone))
+    scheduled_task_ids = list(task_last_session)
+    
+    open_task_filter = (
+        Task.user_id == user.id,
+        Task.is_completed.is_(False),
+        Task.is_recurring_template.is_(False),
+    )
+    unscheduled_filter = (*open_task_filter, Task.id.notin_(scheduled_task_ids))
+    
+    # One round trip for the unscheduled work: window aggregates are computed over
+    # every matching row before LIMIT, so the first few tasks shown in the warning
+    # carry the full count and total minutes
+    unscheduled_rows = (
+        db.query(
+            Task.title,
+            Task.estimated_minutes,
+            func.count(Task.id).over(),
+            func.coalesce(func.sum(Task.estimated_minutes).over(), 0),
         )
+        .filter(*unscheduled_filter)
+        .order_by(Task.id)
+        .limit(5)
         .all()
     )
-    
-    window_info = _calculate_available_hours_from_windows(user)
-    daily_scheduled_hours, scheduled_task_ids = _collect_schedule_data(plan)
-    
-    unscheduled_tasks = [task for task in all_tasks if task.id not in scheduled_task_ids]
-    unscheduled_hours = sum(task.estimated_minutes for task in unscheduled_tasks) / 60
+    if unscheduled_rows:
+        _, _, unscheduled_count, unscheduled_minutes = unscheduled_rows[0]
+    else:
+        unscheduled_count, unscheduled_minutes = 0, 0
+    unscheduled_hours = unscheduled_minutes / 60
     
     warnings = []
     
     # 1. OVERLOADED - Tasks that couldn't fit
-    if unscheduled_tasks:
+    if unscheduled_count:
         warnings.append({
             "type": "overloaded",
             "severity": "hard",
-            "title": f"{len(unscheduled_tasks)} Task(s) Couldn't Fit",
+            "title": f"{unscheduled_count} Task(s) Couldn't Fit",
             "message": f"{unscheduled_hours:.0f}h of work couldn't be scheduled into your available time.",
             "tasks": [
-                {"title": task.title, "hours": task.estimated_minutes / 60}
-                for task in unscheduled_tasks[:5]
+                {"title": row.title, "hours": row.estimated_minutes / 60}
+                for row in unscheduled_rows
             ],
             "suggestions": [
                 "Add more study time in Settings",
@@ -804,7 +930,16 @@ def analyze_post_generation(
         })
     
     # 2. DEADLINE RISK - Tasks scheduled too close to deadline
-    tight_deadlines = _get_tight_deadline_tasks(plan, all_tasks)
+    # (an empty schedule has no scheduled tasks and no heavy days, so both checks are skipped)
+    if scheduled_task_ids:
+        scheduled_tasks = (
+            db.query(Task.id, Task.title, Task.deadline)
+            .filter(*open_task_filter, Task.id.in_(scheduled_task_ids))
+            .all()
+        )
+        tight_deadlines = _get_tight_deadline_tasks(task_last_session, scheduled_tasks)
+    else:
+        tight_deadlines = []
     if tight_deadlines:
         warnings.append({
             "type": "deadline_risk",
@@ -819,7 +954,8 @@ def analyze_post_generation(
         })
     
     # 3. BURNOUT RISK - Consecutive heavy days
-    burnout_info = _get_burnout_risk(daily_scheduled_hours)
+    total_scheduled_hours = sum(daily_scheduled_hours.values())
+    burnout_info = _get_burnout_risk(daily_scheduled_hours) if total_scheduled_hours else None
     if burnout_info:
         warnings.append({
             "type": "burnout_risk",
@@ -834,36 +970,28 @@ def analyze_post_generation(
             ],
         })
     
-    scheduled_hours_list = list(daily_scheduled_hours.values()) if daily_scheduled_hours else [0]
-    
     return {
         "warnings": warnings,
         "metrics": {
-            "total_scheduled_hours": sum(daily_scheduled_hours.values()),
+            "total_scheduled_hours": total_scheduled_hours,
             "unscheduled_hours": unscheduled_hours,
-            "unscheduled_task_count": len(unscheduled_tasks),
+            "unscheduled_task_count": unscheduled_count,
             "daily_distribution": {
-                day.strftime("%A"): hours
+                WEEKDAY_NAMES[day.weekday()]: hours
                 for day, hours in daily_scheduled_hours.items()
             },
         },
     }
 
 
-def _get_tight_deadline_tasks(plan: WeeklyPlan, all_tasks: list[Task]) -> list[dict[str, Any]]:
-    """Get tasks scheduled too close to their deadline."""
-    task_last_session = {}
-    for day_plan in plan.days:
-        for block in day_plan.sessions:
-            if block.task_id:
-                task_last_session[block.task_id] = max(
-                    task_last_session.get(block.task_id, block.end_time),
-                    block.end_time
-                )
-    
+def _get_tight_deadline_tasks(
+    task_last_session: dict[int, datetime], all_tasks: list[Task]
+) -> list[dict[str, Any]]:
+    """Get tasks scheduled too close to their deadline (task_last_session from _collect_schedule_data)."""
+    tasks_by_id = {t.id: t for t in all_tasks}
     tight_deadlines = []
     for task_id, last_session_end in task_last_session.items():
-        task = next((t for t in all_tasks if t.id == task_id), None)
+        task = tasks_by_id.get(task_id)
         if not task or not task.deadline:
             continue
         
@@ -893,7 +1021,7 @@ def _get_burnout_risk(daily_scheduled_hours: dict[date, float]) -> dict[str, Any
                 return {
                     "streak_length": len(current_streak),
                     "total_hours": sum(h for _, h in current_streak),
-                    "days": [d.strftime("%A") for d, _ in current_streak],
+                    "days": [WEEKDAY_NAMES[d.weekday()] for d, _ in current_streak],
                 }
             current_streak = []
     
@@ -902,7 +1030,7 @@ def _get_burnout_risk(daily_scheduled_hours: dict[date, float]) -> dict[str, Any
         return {
             "streak_length": len(current_streak),
             "total_hours": sum(h for _, h in current_streak),
-            "days": [d.strftime("%A") for d, _ in current_streak],
+            "days": [WEEKDAY_NAMES[d.weekday()] for d, _ in current_streak],
         }
     
     return None
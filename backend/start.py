@@ -4,10 +4,12 @@ On a fresh database (no tables), creates all tables from models and stamps
 Alembic to head. On an existing database, runs Alembic migrations normally.
 """
 
-import subprocess
+import os
 import sys
 import traceback
 
+from alembic import command
+from alembic.config import Config
 from sqlalchemy import inspect
 
 from app.db.session import engine
@@ -17,6 +19,17 @@ from app.models import (  # noqa: F401
     ScheduleConstraint, StudySession, Subject, Task, User,
 )
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _run_alembic(action, revision: str) -> None:
+    """Run an Alembic command in this process on the app engine (no interpreter spawn)."""
+    cfg = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BASE_DIR, "alembic"))
+    with engine.begin() as connection:
+        cfg.attributes["connection"] = connection
+        action(cfg, revision)
+
 
 def main():
     inspector = inspect(engine)
@@ -26,11 +39,11 @@ def main():
         print("Fresh database detected — creating all tables...")
         Base.metadata.create_all(bind=engine)
         print("Tables created. Stamping Alembic to head...")
-        subprocess.check_call([sys.executable, "-m", "alembic", "stamp", "head"])
+        _run_alembic(command.stamp, "head")
         print("Done.")
     else:
         print("Existing database — running migrations...")
-        subprocess.check_call([sys.executable, "-m", "alembic", "upgrade", "head"])
+        _run_alembic(command.upgrade, "head")
         print("Migrations complete.")
 
 
@@ -1,5 +1,6 @@
 import uuid
 
+import pytest  # pyright: ignore[reportMissingImports]
 from fastapi.testclient import TestClient
 
 from app.main import create_app
@@ -7,10 +8,17 @@ from app.main import create_app
 _PW_FIELD = "pass" + "word"
 
 
-def test_register_and_login_flow():
-    app = create_app()
-    client = TestClient(app)
+@pytest.fixture(scope="module")
+def client():
+    """One app and client for the module (overrides conftest's per-test client).
 
+    Tests stay independent via unique emails on the shared test database.
+    """
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+def test_register_and_login_flow(client):
     unique = uuid.uuid4().hex[:12]
     payload = {
         "email": f"student-{unique}@example.com",
@@ -32,9 +40,7 @@ def test_register_and_login_flow():
     assert login_tokens["access_token"]
 
 
-def test_refresh_token_returns_new_pair():
-    app = create_app()
-    client = TestClient(app)
+def test_refresh_token_returns_new_pair(client):
     unique = uuid.uuid4().hex[:12]
     email = f"refresh-{unique}@example.com"
     client.post(
@@ -58,8 +64,6 @@ def test_refresh_token_returns_new_pair():
     assert body["refresh_token"]
 
 
-def test_users_me_unauthorized_without_token():
-    app = create_app()
-    client = TestClient(app)
+def test_users_me_unauthorized_without_token(client):
     r = client.get("/users/me")
     assert r.status_code == 401
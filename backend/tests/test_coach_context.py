@@ -6,8 +6,9 @@ from zoneinfo import ZoneInfo
 import json
 
 import pytest  # pyright: ignore[reportMissingImports]
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.ext.compiler import compiles
 
@@ -34,22 +35,45 @@ def _compile_array_sqlite(type_: ARRAY, compiler, **kw):
     return "JSON"
 
 
-@pytest.fixture()
+@pytest.fixture(scope="module")
 def engine():
-    engine = create_engine("sqlite:///:memory:", future=True)
+    # One shared in-memory DB (StaticPool) whose schema is created once per module;
+    # tests are isolated by rolling back below
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        future=True,
+    )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; emit BEGIN ourselves
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
     Base.metadata.create_all(engine)
     try:
         yield engine
     finally:
-        Base.metadata.drop_all(engine)
         engine.dispose()
 
 
 @pytest.fixture()
-def db_session(engine: Session):
-    with Session(engine) as session:
+def db_session(engine):
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Session commits/rollbacks act on SAVEPOINTs inside the outer transaction
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
         yield session
-        session.rollback()
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
 
 
 def test_build_coach_context_includes_recent_activity(monkeypatch: pytest.MonkeyPatch, db_session: Session):
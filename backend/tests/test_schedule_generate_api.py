@@ -32,3 +32,27 @@ def test_generate_weekly_schedule_returns_plan(client, auth_headers, db_session,
     body = r.json()
     assert "days" in body
     assert len(body["days"]) == 7
+
+
+def test_generate_weekly_schedule_schedules_rescheduled_overdue_task(db_session, test_user):
+    from datetime import datetime, timedelta, timezone
+
+    from app.services.scheduling import generate_weekly_schedule
+
+    ref = datetime(2026, 3, 2, 6, 0, tzinfo=timezone.utc)
+    task = Task(
+        user_id=test_user.id,
+        title="Overdue essay",
+        estimated_minutes=90,
+        priority=TaskPriority.MEDIUM,
+        deadline=(ref - timedelta(days=2)).replace(tzinfo=None),
+        is_recurring_template=False,
+    )
+    db_session.add(task)
+    db_session.commit()
+
+    plan, info = generate_weekly_schedule(db_session, test_user, reference=ref)
+
+    assert [r["task_id"] for r in info["rescheduled"]] == [task.id]
+    scheduled_ids = {s.task_id for d in plan.days for s in d.sessions}
+    assert task.id in scheduled_ids
@@ -103,6 +103,30 @@ def test_interleave_subjects_alternates_focus():
     assert reordered[1].subject_id == 2
 
 
+def test_interleave_subjects_never_moves_critical_sessions():
+    """Priorities come from TaskPriority values; critical sessions keep their place."""
+    reference = datetime.now(timezone.utc)
+
+    def block(subject_id: int, task_id: int) -> StudyBlock:
+        return StudyBlock(
+            start_time=reference,
+            end_time=reference,
+            subject_id=subject_id,
+            task_id=task_id,
+            focus=str(task_id),
+            energy_level="medium",
+        )
+
+    medium, critical = TaskPriority.MEDIUM.value, TaskPriority.CRITICAL.value
+    # A critical session must not be swapped down...
+    sessions = [block(1, 1), block(1, 2), block(2, 3)]
+    out = interleave_subjects(sessions.copy(), {1: medium, 2: critical, 3: medium})
+    assert [s.task_id for s in out] == [1, 2, 3]
+    # ...nor pulled up ahead of the sessions before it
+    out = interleave_subjects(sessions.copy(), {1: medium, 2: medium, 3: critical})
+    assert [s.task_id for s in out] == [1, 2, 3]
+
+
 def test_interleave_subjects_no_priorities_returns_unchanged():
     reference = datetime.now(timezone.utc)
     sessions = [
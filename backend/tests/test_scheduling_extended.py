@@ -7,12 +7,14 @@ from app.models.daily_energy import EnergyLevel
 from app.models.subject import Subject, SubjectDifficulty, SubjectPriority
 from app.models.task import Task, TaskPriority
 from app.models.user import User
-from app.schemas.schedule import DailyPlan
+from app.schemas.schedule import DailyPlan, StudyBlock
 from app.services.scheduling import (
+    _bucket_constraints_by_day,
     _energy_cap,
     apply_constraints,
     build_weekly_plan,
     calculate_weights,
+    insert_breaks,
 )
 
 
@@ -57,6 +59,27 @@ def test_apply_constraints_empty_when_no_overlap():
     assert apply_constraints([], [], None) == []
 
 
+def test_windows_fully_blocked_requires_constraints_to_cover_every_block():
+    from zoneinfo import ZoneInfo
+
+    from app.services.scheduling import _windows_fully_blocked
+
+    user_tz = ZoneInfo("UTC")
+    blocks = [(datetime(2026, 3, 2, 10, 0), datetime(2026, 3, 2, 12, 0))]
+
+    def busy(start: time, end: time) -> ScheduleConstraint:
+        return ScheduleConstraint(
+            user_id=1, name="Busy", type=ConstraintType.BUSY, is_recurring=True,
+            days_of_week=[0], start_time=start, end_time=end,
+        )
+
+    morning = busy(time(9, 0), time(11, 0))
+    late_morning = busy(time(11, 0), time(12, 30))
+    assert _windows_fully_blocked(blocks, [late_morning, morning], user_tz)
+    assert not _windows_fully_blocked(blocks, [morning], user_tz)
+    assert not _windows_fully_blocked(blocks, [], user_tz)
+
+
 def _sample_user() -> User:
     u = User(
         id=1,
@@ -224,3 +247,174 @@ def test_build_weekly_plan_two_subjects_three_open_tasks_allocates_sessions():
     assert len(all_sessions) >= 1
     subjects_seen = {s.subject_id for s in all_sessions if s.subject_id is not None}
     assert len(subjects_seen) >= 1
+
+
+def test_build_weekly_plan_never_swaps_a_session_into_blocked_time():
+    """A constraint gap that is exactly one break long must not let sessions trade places."""
+    from zoneinfo import ZoneInfo
+
+    user = _sample_user()
+    user.preferred_study_windows = [{"type": "custom", "value": {"start": "17:00", "end": "21:00"}}]
+    user.break_duration = 10
+    user.max_session_length = 40
+    busy = ScheduleConstraint(
+        user_id=1,
+        name="Call",
+        type=ConstraintType.BUSY,
+        is_recurring=True,
+        days_of_week=[0],  # 2026-03-02 is a Monday
+        start_time=time(18, 5),
+        end_time=time(18, 15),
+    )
+    ref = datetime(2026, 3, 2, 9, 0, 0, tzinfo=timezone.utc)
+    tasks = [
+        Task(id=1, user_id=1, subject_id=1, title="A", estimated_minutes=55, priority=TaskPriority.HIGH,
+             is_completed=False, is_recurring_template=False),
+        Task(id=2, user_id=1, subject_id=2, title="B", estimated_minutes=40, priority=TaskPriority.MEDIUM,
+             is_completed=False, is_recurring_template=False),
+    ]
+    subjects = [
+        Subject(id=subject_id, user_id=1, name=name, priority=SubjectPriority.MEDIUM,
+                difficulty=SubjectDifficulty.MEDIUM, workload=3, color="#000")
+        for subject_id, name in ((1, "Maths"), (2, "History"))
+    ]
+    wt = calculate_weights(tasks, subjects, ref, ZoneInfo("UTC"))
+    plan = build_weekly_plan(user, wt, [busy], {}, ref)
+
+    monday = plan.days[0].sessions
+    assert [(s.task_id, s.start_time, s.end_time) for s in monday] == [
+        (1, datetime(2026, 3, 2, 17, 0), datetime(2026, 3, 2, 17, 40)),
+        (1, datetime(2026, 3, 2, 17, 50), datetime(2026, 3, 2, 18, 5)),
+        (2, datetime(2026, 3, 2, 18, 15), datetime(2026, 3, 2, 18, 55)),
+    ]
+
+def test_build_weekly_plan_days_start_at_local_midnight_across_dst():
+    """Day starts follow local midnight when the week crosses a DST change."""
+    user = _sample_user()
+    user.timezone = "America/New_York"
+    ref = datetime(2026, 3, 7, 12, 0, 0, tzinfo=timezone.utc)  # DST begins 2026-03-08
+    plan = build_weekly_plan(user, [], [], {}, ref)
+    assert plan.days[0].day == datetime(2026, 3, 7, 5, 0, 0)
+    assert plan.days[1].day == datetime(2026, 3, 8, 5, 0, 0)
+    assert plan.days[2].day == datetime(2026, 3, 9, 4, 0, 0)
+
+
+def test_bucket_constraints_by_day_matches_weekdays_and_one_time_spans():
+    from datetime import date
+    from zoneinfo import ZoneInfo
+
+    weekly = ScheduleConstraint(
+        user_id=1,
+        name="Lecture",
+        type=ConstraintType.CLASS,
+        is_recurring=True,
+        days_of_week=[0, 2],
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+    )
+    trip = ScheduleConstraint(
+        user_id=1,
+        name="Trip",
+        type=ConstraintType.BLOCKED,
+        is_recurring=False,
+        start_datetime=datetime(2026, 3, 3, 8, 0),
+        end_datetime=datetime(2026, 3, 4, 20, 0),
+    )
+    by_day = _bucket_constraints_by_day([weekly, trip], date(2026, 3, 2), 7, ZoneInfo("UTC"))
+    assert len(by_day) == 7
+    assert by_day[date(2026, 3, 2)] == [weekly]
+    assert by_day[date(2026, 3, 3)] == [trip]
+    assert by_day[date(2026, 3, 4)] == [weekly, trip]
+    assert by_day[date(2026, 3, 5)] == []
+
+
+def test_insert_breaks_shifts_following_sessions():
+    start = datetime(2026, 3, 2, 17, 0, 0)
+    sessions = [
+        StudyBlock(start_time=start, end_time=start + timedelta(minutes=60), focus="A"),
+        StudyBlock(
+            start_time=start + timedelta(minutes=60),
+            end_time=start + timedelta(minutes=120),
+            focus="B",
+        ),
+        StudyBlock(
+            start_time=start + timedelta(minutes=150),
+            end_time=start + timedelta(minutes=180),
+            focus="C",
+        ),
+    ]
+    out = insert_breaks(sessions, 15)
+    assert [s.start_time for s in out] == [
+        start,
+        start + timedelta(minutes=75),
+        start + timedelta(minutes=150),
+    ]
+    assert out[1].end_time == start + timedelta(minutes=135)
+
+
+def test_parse_study_windows_cached_result_is_not_shared():
+    from app.services.scheduling import _parse_study_windows
+
+    raw = [{"type": "custom", "value": {"start": "08:00", "end": "10:30"}}]
+    first = _parse_study_windows(raw)
+    first.append((time(1, 0), time(2, 0)))
+    assert _parse_study_windows(raw) == [(time(8, 0), time(10, 30))]
+
+
+def test_calculate_window_pointer_never_starts_in_the_past():
+    from app.services.scheduling import _calculate_window_pointer
+
+    now = datetime(2026, 3, 2, 18, 30)
+    today = (datetime(2026, 3, 2, 17, 0), datetime(2026, 3, 2, 21, 0))
+    tomorrow = (datetime(2026, 3, 3, 17, 0), datetime(2026, 3, 3, 21, 0))
+    earlier = (datetime(2026, 3, 2, 7, 0), datetime(2026, 3, 2, 11, 0))
+    assert _calculate_window_pointer(*today, now) == now
+    assert _calculate_window_pointer(*tomorrow, now) == tomorrow[0]
+    assert _calculate_window_pointer(*earlier, now) is None
+    assert _calculate_window_pointer(*earlier, None) == earlier[0]
+
+
+def test_local_window_to_range_fixed_offset_matches_zoneinfo():
+    from zoneinfo import ZoneInfo
+
+    from app.services.scheduling import _constant_utc_offset, _local_window_to_range
+
+    tz = ZoneInfo("Asia/Singapore")
+    midnight = datetime(2026, 3, 2, tzinfo=tz)
+    offset = _constant_utc_offset(midnight, 8)
+    assert offset == timedelta(hours=8)
+    for block in [(time(9, 0), time(11, 30)), (time(22, 0), time(1, 0))]:
+        assert _local_window_to_range(midnight, block, offset) == _local_window_to_range(midnight, block)
+
+    new_york = datetime(2026, 3, 7, tzinfo=ZoneInfo("America/New_York"))
+    assert _constant_utc_offset(new_york, 8) is None
+
+
+def test_order_sessions_with_breaks_swaps_back_to_back_sessions_in_time():
+    from app.services.scheduling import _order_sessions_with_breaks
+
+    start = datetime(2026, 3, 2, 17, 0, 0)
+
+    def block(offset: int, minutes: int, subject_id: int, task_id: int) -> StudyBlock:
+        begin = start + timedelta(minutes=offset)
+        return StudyBlock(
+            start_time=begin,
+            end_time=begin + timedelta(minutes=minutes),
+            subject_id=subject_id,
+            task_id=task_id,
+            focus=str(task_id),
+        )
+
+    sessions = [block(0, 60, 1, 1), block(60, 60, 1, 2), block(120, 30, 2, 3)]
+    out = _order_sessions_with_breaks(sessions, 10, {1: "medium", 2: "medium", 3: "medium"})
+    assert [s.task_id for s in out] == [1, 3, 2]
+    assert [(s.start_time, s.end_time) for s in out] == [
+        (start, start + timedelta(minutes=60)),
+        (start + timedelta(minutes=70), start + timedelta(minutes=100)),
+        (start + timedelta(minutes=110), start + timedelta(minutes=170)),
+    ]
+
+    # A critical session is never swapped, only spaced out by the break
+    sessions = [block(0, 60, 1, 1), block(60, 60, 1, 2), block(120, 30, 2, 3)]
+    out = _order_sessions_with_breaks(sessions, 10, {1: "medium", 2: "medium", 3: "critical"})
+    assert [s.task_id for s in out] == [1, 2, 3]
@@ -21,3 +21,22 @@ def test_safe_tz_none_falls_back_to_utc():
 
 def test_safe_tz_empty_string_falls_back_to_utc():
     assert _safe_tz("") == ZoneInfo("UTC")
+
+
+def test_safe_tz_is_memoized():
+    _safe_tz.cache_clear()
+    _safe_tz("Europe/Paris")
+    _safe_tz("Europe/Paris")
+    info = _safe_tz.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_safe_tz_fallback_is_memoized(caplog):
+    _safe_tz.cache_clear()
+    with caplog.at_level("WARNING"):
+        assert _safe_tz("Not/A/Zone") == ZoneInfo("UTC")
+        assert _safe_tz("Not/A/Zone") == ZoneInfo("UTC")
+    info = _safe_tz.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    # The invalid name is only resolved (and warned about) once
+    assert sum("Not/A/Zone" in record.getMessage() for record in caplog.records) == 1
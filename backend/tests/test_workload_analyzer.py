@@ -0,0 +1,264 @@
+"""Unit tests for pre/post-generation workload analysis helpers."""
+
+from datetime import datetime, timedelta, timezone
+
+from app.models.study_session import SessionStatus, StudySession
+from app.models.task import Task, TaskPriority
+from app.services import workload_analyzer
+from app.services.workload_analyzer import (
+    _calculate_historical_completion_rate,
+    _detect_deadline_issues,
+    _preprocess_tasks,
+    analyze_post_generation,
+    analyze_pre_generation,
+)
+
+REF = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def _task(task_id: int, minutes: int, deadline: datetime | None, completed: bool = False) -> Task:
+    return Task(
+        id=task_id,
+        user_id=1,
+        title=f"Task {task_id}",
+        estimated_minutes=minutes,
+        priority=TaskPriority.MEDIUM,
+        is_completed=completed,
+        deadline=deadline,
+    )
+
+
+def test_preprocess_tasks_skips_completed_and_normalizes_deadlines():
+    tasks = [
+        _task(1, 90, datetime(2026, 3, 4, 12, 0)),
+        _task(2, 30, None),
+        _task(3, 60, datetime(2026, 3, 3), completed=True),
+    ]
+    infos = _preprocess_tasks(tasks, REF)
+    assert [info.task.id for info in infos] == [1, 2]
+    assert infos[0].hours == 1.5
+    assert infos[0].deadline_utc == datetime(2026, 3, 4, 12, 0, tzinfo=timezone.utc)
+    assert infos[0].days_until == 2
+    assert infos[1].deadline_utc is None and infos[1].days_until is None
+
+
+def test_detect_deadline_issues_finds_risks_and_clusters():
+    due = datetime(2026, 3, 3, 17, 0)
+    infos = _preprocess_tasks([_task(i, 240, due) for i in range(1, 4)], REF)
+    risks, clusters = _detect_deadline_issues(infos, available_hours_per_week=14)
+    assert [r["task_id"] for r in risks] == [1, 2, 3]
+    assert risks[0]["hours_short"] == 2
+    assert len(clusters) == 1
+    assert clusters[0]["deadline_date"] == "2026-03-03"
+    assert clusters[0]["total_hours"] == 12
+
+
+def test_historical_completion_rate_counts_recent_sessions_in_sql(db_session, test_user):
+    assert _calculate_historical_completion_rate(db_session, test_user.id) == 0.65
+
+    now = datetime.utcnow()
+    statuses = [SessionStatus.COMPLETED] * 3 + [SessionStatus.SKIPPED]
+    for i, status in enumerate(statuses):
+        start = now - timedelta(days=i + 1)
+        db_session.add(StudySession(
+            user_id=test_user.id, start_time=start, end_time=start + timedelta(hours=1), status=status,
+        ))
+    # Older than the 4-week window, so ignored
+    old_start = now - timedelta(weeks=6)
+    db_session.add(StudySession(
+        user_id=test_user.id, start_time=old_start, end_time=old_start + timedelta(hours=1),
+        status=SessionStatus.SKIPPED,
+    ))
+    db_session.commit()
+
+    assert _calculate_historical_completion_rate(db_session, test_user.id) == 0.75
+
+
+def test_analyze_pre_generation_cache_is_invalidated_by_task_changes(db_session, test_user, monkeypatch):
+    workload_analyzer._pre_generation_cache.clear()
+    uncached = workload_analyzer._analyze_pre_generation
+    calls = []
+
+    def counting_analysis(*args):
+        calls.append(args)
+        return uncached(*args)
+
+    monkeypatch.setattr(workload_analyzer, "_analyze_pre_generation", counting_analysis)
+
+    first = analyze_pre_generation(db_session, test_user)
+    assert first["metrics"]["total_task_hours"] == 0
+
+    # An unchanged second call is served from the cache, as a copy callers cannot corrupt
+    first["warnings"].append({"type": "mutated"})
+    assert analyze_pre_generation(db_session, test_user)["warnings"] == []
+    assert len(calls) == 1
+
+    db_session.add(Task(user_id=test_user.id, title="New", estimated_minutes=120, priority=TaskPriority.MEDIUM))
+    db_session.commit()
+    assert analyze_pre_generation(db_session, test_user)["metrics"]["total_task_hours"] == 2
+    assert len(calls) == 2
+
+
+def test_pre_generation_cache_is_bounded_and_drops_expired_entries(monkeypatch):
+    cache = workload_analyzer._pre_generation_cache
+    cache.clear()
+    monkeypatch.setattr(workload_analyzer, "PRE_GENERATION_CACHE_MAX_USERS", 2)
+    ttl = workload_analyzer.PRE_GENERATION_CACHE_TTL_SECONDS
+
+    workload_analyzer._store_pre_generation_result(1, ("v",), 0.0, {})
+    workload_analyzer._store_pre_generation_result(2, ("v",), 1.0, {})
+    workload_analyzer._store_pre_generation_result(3, ("v",), 2.0, {})
+    assert list(cache) == [2, 3]  # least recently used user evicted
+
+    workload_analyzer._store_pre_generation_result(4, ("v",), 1.0 + ttl, {})
+    assert list(cache) == [3, 4]  # user 2 expired and was dropped on write
+    cache.clear()
+
+
+def test_pre_generation_cache_is_safe_under_concurrent_access(monkeypatch):
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = workload_analyzer._pre_generation_cache
+    cache.clear()
+    monkeypatch.setattr(workload_analyzer, "PRE_GENERATION_CACHE_MAX_USERS", 8)
+    ttl = workload_analyzer.PRE_GENERATION_CACHE_TTL_SECONDS
+    previous_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # force frequent thread switches
+
+    def worker(seed: int) -> None:
+        for i in range(2000):
+            user_id = (seed * 7 + i) % 32
+            now = float(i % (2 * ttl))  # entries keep expiring and being replaced
+            if workload_analyzer._get_cached_pre_generation_result(user_id, ("v",), now) is None:
+                workload_analyzer._store_pre_generation_result(user_id, ("v",), now, {"user": user_id})
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(worker, seed) for seed in range(8)]:
+                future.result()  # re-raises KeyError / "mutated during iteration"
+    finally:
+        sys.setswitchinterval(previous_interval)
+
+    assert len(cache) <= 8
+    cache.clear()
+
+def test_collect_schedule_data_accepts_plain_date_days():
+    from datetime import date
+
+    from app.schemas.schedule import DailyPlan, StudyBlock, WeeklyPlan
+    from app.services.workload_analyzer import _collect_schedule_data
+
+    start = datetime(2026, 3, 2, 9, 0)
+    plan = WeeklyPlan(
+        user_id=1,
+        generated_at=REF,
+        days=[
+            DailyPlan(day=date(2026, 3, 2), sessions=[
+                StudyBlock(start_time=start, end_time=start + timedelta(minutes=90), task_id=7, focus="Read"),
+            ]),
+            DailyPlan(day=datetime(2026, 3, 3, 5, 0), sessions=[]),
+        ],
+    )
+    hours, task_last_session = _collect_schedule_data(plan)
+    assert hours == {date(2026, 3, 2): 1.5, date(2026, 3, 3): 0}
+    assert task_last_session == {7: start + timedelta(minutes=90)}
+
+
+def test_collect_schedule_data_keys_days_by_local_date_across_spring_forward():
+    from datetime import date
+    from zoneinfo import ZoneInfo
+
+    from app.models.user import User
+    from app.services.scheduling import build_weekly_plan
+    from app.services.workload_analyzer import _collect_schedule_data
+
+    user = User(
+        id=1,
+        email="london@example.com",
+        hashed_password="x",
+        timezone="Europe/London",
+        weekly_study_hours=10,
+        preferred_study_windows=["evening"],
+        max_session_length=60,
+        break_duration=10,
+    )
+    # Clocks go forward on 2026-03-29: that day and the next both start on 29 March UTC
+    plan = build_weekly_plan(user, [], [], {}, datetime(2026, 3, 27, 12, 0, tzinfo=timezone.utc))
+    assert plan.days[2].day.date() == plan.days[3].day.date() == date(2026, 3, 29)
+
+    hours, _ = _collect_schedule_data(plan, ZoneInfo("Europe/London"))
+    assert list(hours) == [date(2026, 3, 27) + timedelta(days=offset) for offset in range(7)]
+
+def test_analyze_post_generation_reports_unscheduled_and_tight_tasks(db_session, test_user):
+    from app.schemas.schedule import DailyPlan, StudyBlock, WeeklyPlan
+
+    start = datetime(2026, 3, 2, 9, 0)
+    tasks = [
+        Task(user_id=test_user.id, title="Essay", estimated_minutes=60, deadline=start + timedelta(hours=3)),
+        Task(user_id=test_user.id, title="Lab", estimated_minutes=90),
+        Task(user_id=test_user.id, title="Reading", estimated_minutes=120),
+        Task(user_id=test_user.id, title="Quiz prep", estimated_minutes=30),
+        Task(user_id=test_user.id, title="Done", estimated_minutes=600, is_completed=True),
+    ]
+    db_session.add_all(tasks)
+    db_session.commit()
+    essay, lab = tasks[0], tasks[1]
+    plan = WeeklyPlan(
+        user_id=test_user.id,
+        generated_at=REF,
+        days=[DailyPlan(day=start, sessions=[
+            StudyBlock(start_time=start, end_time=start + timedelta(hours=1), task_id=essay.id, focus="Essay"),
+            StudyBlock(start_time=start + timedelta(hours=1), end_time=start + timedelta(hours=2), task_id=lab.id, focus="Lab"),
+        ])],
+    )
+
+    result = analyze_post_generation(plan, db_session, test_user, REF)
+
+    assert result["metrics"]["unscheduled_task_count"] == 2
+    assert result["metrics"]["unscheduled_hours"] == 2.5
+    assert result["metrics"]["total_scheduled_hours"] == 2
+    overloaded = next(w for w in result["warnings"] if w["type"] == "overloaded")
+    assert [t["title"] for t in overloaded["tasks"]] == ["Reading", "Quiz prep"]
+    tight = next(w for w in result["warnings"] if w["type"] == "deadline_risk")
+    assert tight["tasks"] == [{"title": "Essay", "buffer_hours": 2.0}]
+
+
+def test_analyze_post_generation_counts_unscheduled_beyond_listed_tasks(db_session, test_user):
+    from app.schemas.schedule import WeeklyPlan
+
+    db_session.add_all(
+        Task(user_id=test_user.id, title=f"Backlog {i}", estimated_minutes=30) for i in range(7)
+    )
+    db_session.commit()
+
+    empty_plan = WeeklyPlan(user_id=test_user.id, generated_at=REF, days=[])
+    result = analyze_post_generation(empty_plan, db_session, test_user, REF)
+
+    assert result["metrics"]["unscheduled_task_count"] == 7
+    assert result["metrics"]["unscheduled_hours"] == 3.5
+    overloaded = next(w for w in result["warnings"] if w["type"] == "overloaded")
+    assert [t["title"] for t in overloaded["tasks"]] == [f"Backlog {i}" for i in range(5)]
+
+    db_session.query(Task).delete()
+    db_session.commit()
+    result = analyze_post_generation(empty_plan, db_session, test_user, REF)
+    assert result["metrics"]["unscheduled_task_count"] == 0
+    assert result["warnings"] == []
+
+
+def test_available_hours_from_windows_is_memoized_per_configuration():
+    from app.models.user import User
+    from app.services.workload_analyzer import (
+        _calculate_available_hours_from_windows,
+        _study_minutes_per_day_for_key,
+    )
+
+    custom = [{"type": "custom", "value": {"start": "22:00", "end": "01:30"}}]
+    _study_minutes_per_day_for_key.cache_clear()
+    first = _calculate_available_hours_from_windows(User(preferred_study_windows=custom))
+    again = _calculate_available_hours_from_windows(User(preferred_study_windows=list(custom)))
+    assert first == again == {"total_hours_per_week": 24.5, "hours_per_day": 3.5, "has_windows": True}
+    assert _study_minutes_per_day_for_key.cache_info().hits == 1
+
+    assert _calculate_available_hours_from_windows(User(preferred_study_windows=["morning"]))["hours_per_day"] == 4